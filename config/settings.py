@@ -6,11 +6,29 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables once per process tree: the sentinel survives
+# importlib.reload() and is inherited by subprocesses, which already see the
+# variables the parent loaded.
+_DOTENV_SENTINEL = "_DOTENV_LOADED"
+if not os.environ.get(_DOTENV_SENTINEL):
+    load_dotenv()
+    os.environ[_DOTENV_SENTINEL] = "1"
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
 
 class Settings:
-    """Application settings"""
+    """Application settings, read from the environment once at import.
+
+    Instances are read-only: no per-instance __dict__ can shadow the class
+    values, and assignments fail loudly instead of drifting from the env.
+    """
+
+    __slots__ = ()
     
     # API Keys
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -38,6 +56,26 @@ class Settings:
     USE_GEMINI: bool = os.getenv("USE_GEMINI", "false").lower() == "true"
     # BGE-M3 for Thai/multilingual embeddings (1024 dim)
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", os.getenv("EMBED_MODEL", "BAAI/bge-m3"))
+    # Shared embedding server (python -m src.embeddings.model_server);
+    # "host:port" or a Unix socket path. Empty = load the model in-process.
+    EMBED_SERVER_ADDRESS: str = os.getenv("EMBED_SERVER_ADDRESS", "")
+    # Empty = the server generates a per-user key file (src/manager_auth.py)
+    EMBED_SERVER_AUTHKEY: str = os.getenv("EMBED_SERVER_AUTHKEY", "")
+    # Warm explain_case server (python -m src.query_server); same address
+    # format. Empty = explain.sock in the per-user runtime directory
+    # (127.0.0.1:50056 on Windows); empty key = generated per-user key file.
+    EXPLAIN_SERVER_ADDRESS: str = os.getenv("EXPLAIN_SERVER_ADDRESS", "")
+    EXPLAIN_SERVER_AUTHKEY: str = os.getenv("EXPLAIN_SERVER_AUTHKEY", "")
+    # Texts per forward pass when embedding nodes. 0 = auto (256 on CUDA, 32 on CPU).
+    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "0"))
+    # sentence-transformers backend: torch | onnx | openvino. onnx/openvino
+    # need `pip install "sentence-transformers[onnx]"` (optimum + onnxruntime)
+    # and are mainly a CPU speed-up.
+    EMBED_BACKEND: str = os.getenv("EMBED_BACKEND", "torch").lower()
+    # Model file inside the export to load with onnx/openvino, e.g. the int8
+    # "onnx/model_qint8_avx512_vnni.onnx" from scripts/export_embed_onnx.py.
+    # Empty = the backend's default (fp32) file.
+    EMBED_ONNX_FILE: str = os.getenv("EMBED_ONNX_FILE", "")
     
     # Directory Paths
     PROJECT_ROOT: Path = Path(__file__).parent.parent
@@ -58,21 +96,57 @@ class Settings:
     DATA_DIR: Path = PROJECT_ROOT / "data"
     DOCUMENTS_DIR: Path = _resolve_documents_dir()
     INDEX_DIR: Path = PROJECT_ROOT / "data" / "index"
+    # Pickled parse results keyed by (path, mtime, size); see src/parse_cache.py
+    PARSE_CACHE_ENABLED: bool = _env_flag("PARSE_CACHE_ENABLED", True)
+    PARSE_CACHE_DIR: Path = Path(os.getenv("PARSE_CACHE_DIR", str(PROJECT_ROOT / "data" / "parse_cache")))
+    # Write-ahead journal for queued credit score results (empty = disabled)
+    RESULT_JOURNAL_PATH: str = os.getenv(
+        "RESULT_JOURNAL_PATH", str(PROJECT_ROOT / "data" / "result_journal.ndjson")
+    )
     
     # Vector Store Settings
     VECTOR_STORE_TYPE: str = os.getenv("VECTOR_STORE_TYPE", "chroma")  # chroma, faiss, simple
+    # FAISS index layout when VECTOR_STORE_TYPE=faiss:
+    # flat (exact) | hnsw | sq8 | hnsw_sq8 | ivfpq | ivfpq_rerank
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "hnsw").lower()
+    FAISS_NLIST: int = int(os.getenv("FAISS_NLIST", "4096"))
+    FAISS_PQ_M: int = int(os.getenv("FAISS_PQ_M", "64"))
+    FAISS_PQ_NBITS: int = int(os.getenv("FAISS_PQ_NBITS", "8"))
+    FAISS_NPROBE: int = int(os.getenv("FAISS_NPROBE", "16"))
+    # Memory-map the persisted index read-only on load (shared across workers)
+    FAISS_MMAP: bool = _env_flag("FAISS_MMAP", True)
+    FAISS_HNSW_M: int = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_HNSW_EF_CONSTRUCTION: int = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+    FAISS_HNSW_EF_SEARCH: int = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+    # ivfpq_rerank: exact-rescore this many candidates per requested result
+    FAISS_RERANK_FACTOR: int = int(os.getenv("FAISS_RERANK_FACTOR", "4"))
     # ChromaDB settings - single source of truth for all modules
     CHROMA_PERSIST_DIR: str = os.getenv("CHROMA_PERSIST_DIR", "./storage/chroma")
     CHROMA_COLLECTION: str = os.getenv("CHROMA_COLLECTION", "credit_policies")
+    # host:port of a `chroma run` server; empty = embedded store at CHROMA_PERSIST_DIR
+    CHROMA_HOST: str = os.getenv("CHROMA_HOST", "")
+    CHROMA_HNSW_M: int = int(os.getenv("CHROMA_HNSW_M", "32"))
+    CHROMA_HNSW_EF_CONSTRUCTION: int = int(os.getenv("CHROMA_HNSW_EF_CONSTRUCTION", "200"))
+    CHROMA_HNSW_EF_SEARCH: int = int(os.getenv("CHROMA_HNSW_EF_SEARCH", "64"))
     
     # Index Settings
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "512"))  # Smaller chunks for better granularity
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "50"))  # More overlap
+    # sentence | token (fixed windows counted by the embedding model's tokenizer)
+    CHUNK_SPLITTER: str = os.getenv("CHUNK_SPLITTER", "sentence").lower()
     
     # Query Settings
     SIMILARITY_TOP_K: int = int(os.getenv("SIMILARITY_TOP_K", "4"))
     SIMILARITY_CUTOFF: float = float(os.getenv("SIMILARITY_CUTOFF", "0.45"))
     RESPONSE_MODE: str = os.getenv("RESPONSE_MODE", "compact")
+    # RAG pipeline knobs read by QueryEngineManager on every query. Low-RAM
+    # machines can shrink the LLM prompt: retrieve 12 candidates, synthesize
+    # from the top 3.
+    RAG_RETRIEVAL_TOP_K: int = int(os.getenv("RAG_RETRIEVAL_TOP_K", "12"))
+    RAG_FINAL_TOP_K: int = int(os.getenv("RAG_FINAL_TOP_K", "3"))
+    RAG_DISABLE_SIM_CUTOFF: bool = _env_flag("RAG_DISABLE_SIM_CUTOFF")
+    RAG_HYBRID_SEARCH: bool = _env_flag("RAG_HYBRID_SEARCH")
+    RAG_DEBUG: bool = _env_flag("RAG_DEBUG")
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
@@ -85,7 +159,18 @@ class Settings:
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Drop the timestamp from log lines and stop recording thread/process
+    # fields process-wide (cheaper per record; use when the supervisor, e.g.
+    # journald or docker, already timestamps output)
+    LOG_FORMAT_COMPACT: bool = _env_flag("LOG_FORMAT_COMPACT")
+    # measure_performance logs every Nth call (with rolling mean/median) instead of every call
+    PERF_LOG_SAMPLE: int = int(os.getenv("PERF_LOG_SAMPLE", "1"))
     
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(
+            f"Settings are read-only; set {name} in the environment or .env instead"
+        )
+
     @classmethod
     def validate(cls) -> bool:
         """Validate required settings"""
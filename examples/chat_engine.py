@@ -4,6 +4,7 @@ Chat engine example for LlamaIndex
 """
 
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Add project root to path
@@ -45,6 +46,15 @@ def main():
     # Chat modes to test
     chat_modes = ["condense_question", "simple"]
     
+    # Test conversation, replayed once per chat mode
+    test_conversation = [
+        "Hello! Can you help me learn about artificial intelligence?",
+        "What are the main types of machine learning?",
+        "Can you explain deep learning in more detail?",
+        "How is AI used in healthcare?",
+        "Thank you for the information!"
+    ]
+    
     print("Testing different chat modes:")
     print("=" * 50)
     
@@ -55,15 +65,6 @@ def main():
         # Create chat engine
         chat_engine = query_manager.create_chat_engine(chat_mode=mode)
         
-        # Test conversation
-        test_conversation = [
-            "Hello! Can you help me learn about artificial intelligence?",
-            "What are the main types of machine learning?",
-            "Can you explain deep learning in more detail?",
-            "How is AI used in healthcare?",
-            "Thank you for the information!"
-        ]
-        
         conversation_history = []
         
         for message in test_conversation:
@@ -151,7 +152,7 @@ def main():
                 conversation_history.append({
                     "user": user_input,
                     "assistant": str(response),
-                    "timestamp": str(Path(__file__).stat().st_mtime)
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 })
                 
             except Exception as e:
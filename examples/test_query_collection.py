@@ -20,6 +20,13 @@ DATA_DIR = project_root / "data" / "documents"
 CHROMA_DIR = project_root / "storage" / "chroma"
 COLLECTION = "credit_policies"
 
+# Whitespace that would break a one-line preview, flattened in one C-level pass.
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+def _preview(text: str, n: int = 150) -> str:
+    return text[:n].translate(_NL_TABLE)
+
 
 def main():
     # Ensure docs exist
@@ -47,46 +54,36 @@ def main():
 
     # Step 2: Query retrieval (no LLM - just vector search)
     print("\n--- Querying collection ---")
-    from llama_index.core import VectorStoreIndex
-    from llama_index.vector_stores.chroma import ChromaVectorStore
-    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-    from llama_index.core.settings import Settings
-
-    embed_model_name = os.getenv("EMBED_MODEL", "BAAI/bge-m3")
-    embed_model = HuggingFaceEmbedding(
-        model_name=embed_model_name,
-        embed_batch_size=32,
-    )
-    Settings.embed_model = embed_model
+    from src.embeddings import get_embed_model
+
+    queries = [
+        "ต้องทำงานมานานเท่าไร",
+        "ต้องมีคะแนนเครดิตเท่าไร"
+    ]
+
+    # One batch = one forward pass for every query below. Reuses the shared
+    # embedding server when EMBED_SERVER_ADDRESS is set.
+    embed_model = get_embed_model(embed_batch_size=len(queries))
 
     import chromadb
     client = chromadb.PersistentClient(path=str(CHROMA_DIR))
     coll = client.get_collection(COLLECTION)
     print(f"Collection '{COLLECTION}' has {coll.count()} chunks")
 
-    vector_store = ChromaVectorStore(chroma_collection=coll)
-    index = VectorStoreIndex.from_vector_store(vector_store)
-    retriever = index.as_retriever(similarity_top_k=3)
+    # ChromaDB native multi-vector query: a single call searches every query
+    # embedding, no retriever / response synthesis needed for this check.
+    query_embeddings = embed_model.get_text_embedding_batch(queries, show_progress=False)
+    result = coll.query(
+        query_embeddings=query_embeddings,
+        n_results=3,
+        include=["documents", "metadatas", "distances"],
+    )
 
-    queries = [
-        "ต้องทำงานมานานเท่าไร",
-        "ต้องมีคะแนนเครดิตเท่าไร"
-    ]
-    for q in queries:
+    for q, documents, distances in zip(queries, result["documents"], result["distances"]):
         print(f"\nQ: {q}")
-        nodes = retriever.retrieve(q)
-        for i, n in enumerate(nodes, 1):
-            text = n.get_content()[:150].replace("\n", " ")
-            print(f"  [{i}] {text}...")
-
-        # ChromaDB native query - raw result
-        # query_embedding = embed_model.get_query_embedding(q)
-        # result = coll.query(
-        #     query_embeddings=[query_embedding],
-        #     n_results=3,
-        #     include=["documents", "metadatas", "distances"],
-        # )
-        # print("\n collection.query result =", result)
+        for i, (doc, distance) in enumerate(zip(documents, distances), 1):
+            text = _preview(doc or "")
+            print(f"  [{i}] ({distance:.4f}) {text}...")
 
     print("\n Query from collection successful")
     return 0
@@ -6,12 +6,22 @@ Diagnostic checks for local Ollama connectivity from Python.
 from __future__ import annotations
 
 import argparse
+import functools
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+# One pooled session for every probe so /api/tags and /api/generate share a
+# keep-alive connection instead of reconnecting per call.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
 
 
 def _print_ok(message: str) -> None:
@@ -32,7 +42,7 @@ def _normalize_base_url(base_url: str) -> str:
 
 def _get_tags(base_url: str, timeout: float) -> dict[str, Any]:
     url = f"{base_url}/api/tags"
-    resp = requests.get(url, timeout=timeout)
+    resp = _SESSION.get(url, timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
@@ -44,15 +54,20 @@ def _post_generate(base_url: str, model: str, timeout: float) -> dict[str, Any]:
         "prompt": "Reply with exactly: ok",
         "stream": False,
     }
-    resp = requests.post(url, json=payload, timeout=timeout)
+    resp = _SESSION.post(url, json=payload, timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
 
-def _ollama_python_chat(base_url: str, model: str) -> str:
+@functools.lru_cache(maxsize=None)
+def _get_ollama_client(base_url: str) -> Any:
     from ollama import Client
 
-    client = Client(host=base_url)
+    return Client(host=base_url)
+
+
+def _ollama_python_chat(base_url: str, model: str) -> str:
+    client = _get_ollama_client(base_url)
     response = client.chat(
         model=model,
         messages=[{"role": "user", "content": "Reply with exactly: ok"}],
@@ -157,8 +172,16 @@ def main() -> int:
             _print_fail(f"Configured model '{model}' is not in /api/tags.")
             _print_warn("Pull the model in Ollama Desktop, then re-run this script.")
 
+        # Only probe generation once the server answered /api/tags, so a down
+        # server costs one timeout. The two probes are independent requests,
+        # so they run concurrently and are reported in a fixed order.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            generate_future = executor.submit(_post_generate, base_url=base_url, model=model, timeout=timeout)
+            chat_future = executor.submit(_ollama_python_chat, base_url=base_url, model=model)
+        # Both probes have finished here (the with block joins them).
+
         try:
-            gen = _post_generate(base_url=base_url, model=model, timeout=timeout)
+            gen = generate_future.result()
             text = str(gen.get("response", "")).strip()
             if text:
                 _print_ok("POST /api/generate succeeded.")
@@ -190,7 +213,7 @@ def main() -> int:
             _print_fail(f"Request error during /api/generate: {exc}")
 
         try:
-            chat_text = _ollama_python_chat(base_url=base_url, model=model)
+            chat_text = chat_future.result()
             if chat_text:
                 _print_ok("ollama Python package chat() succeeded.")
                 print(f"Chat sample: {chat_text[:120]}")
@@ -1700,13 +1700,13 @@ def init_query_fn(manager, use_self_rag: bool):
 
 def init_rag_manager():
     """Initialize ChromaDB + embedding model + QueryEngineManager."""
-    import chromadb
     from llama_index.core import VectorStoreIndex
     from llama_index.core.settings import Settings
     from llama_index.embeddings.huggingface import HuggingFaceEmbedding
     from llama_index.vector_stores.chroma import ChromaVectorStore
 
     from config.settings import settings as cfg
+    from src.chroma_index import chroma_client, open_collection
     from src.query_engine import QueryEngineManager
 
     print(f"Loading embedding model: {cfg.EMBEDDING_MODEL} ...")
@@ -1714,8 +1714,7 @@ def init_rag_manager():
         model_name=cfg.EMBEDDING_MODEL,
         embed_batch_size=32,
     )
-    client = chromadb.PersistentClient(path=cfg.CHROMA_PERSIST_DIR)
-    collection = client.get_collection(cfg.CHROMA_COLLECTION)
+    collection = open_collection(chroma_client())
     vector_store = ChromaVectorStore(chroma_collection=collection)
     index = VectorStoreIndex.from_vector_store(vector_store)
     manager = QueryEngineManager(index)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Export the embedding model to ONNX with an int8-quantized copy for CPU serving.
+
+    python scripts/export_embed_onnx.py ./storage/bge-m3-onnx --config avx512_vnni
+
+Then point the app at the export:
+
+    EMBEDDING_MODEL=./storage/bge-m3-onnx
+    EMBED_BACKEND=onnx
+    EMBED_ONNX_FILE=onnx/model_qint8_avx512_vnni.onnx
+
+Requires `pip install "sentence-transformers[onnx]"`. Use --config avx2 or
+arm64 on CPUs without AVX-512 VNNI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output_dir", type=Path, help="Directory to write the export to")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL, help="Model to export")
+    parser.add_argument(
+        "--config",
+        default="avx512_vnni",
+        choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+        help="Dynamic int8 quantization target",
+    )
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(args.model, backend="onnx")
+    model.save_pretrained(str(args.output_dir))
+    export_dynamic_quantized_onnx_model(model, args.config, str(args.output_dir))
+
+    quantized = args.output_dir / "onnx" / f"model_qint8_{args.config}.onnx"
+    print(f"Wrote {quantized}")
+    print(f"Set EMBEDDING_MODEL={args.output_dir} EMBED_BACKEND=onnx EMBED_ONNX_FILE=onnx/{quantized.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,7 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 import logging
 
@@ -10,8 +12,11 @@ import nest_asyncio
 nest_asyncio.apply()
 
 from src.api.routes import scoring, rag
-from src.db.database import engine
+from src.db.database import async_engine
 from src.db import models
+from src.services.audit_log import start_audit_worker, stop_audit_worker
+from src.services.feature_merger import FeatureMergerService
+from src.services.result_writer import start_result_writer, stop_result_writer
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +26,30 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables on startup through the pooled async engine
+    # instead of blocking at import time.
+    async with async_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        await conn.run_sync(models.create_missing_indexes)
+    # Cached features describe the database of a previous lifespan.
+    FeatureMergerService.clear_cache()
+    start_audit_worker()
+    start_result_writer()
+    yield
+    await stop_result_writer()
+    await stop_audit_worker()
+    FeatureMergerService.clear_cache()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="AI Credit Scoring API Gateway",
     description="Data Pipeline entry point for the Credit Scoring ML Models.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Route results (e.g. SHAP dicts in ScoringResponse) are rendered by orjson.
+    default_response_class=ORJSONResponse,
 )
 
 # Custom validation exception handler (Dead Letter Queue entry point for malformed payloads)
@@ -37,12 +59,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     Catches 422 errors and logs them. 
     In production, push `request.body` to Dead Letter Queue (DLQ).
     """
-    body = await request.body()
     # Log only safe metadata — never the raw body which may contain PII (PDPA/GDPR).
+    # The size comes from the header when present so the body is not re-read.
+    content_length = request.headers.get("content-length")
+    if content_length is None or not content_length.isdigit():
+        content_length = len(await request.body())
     logger.error(
         "[DLQ APPEND] Malformed payload | path=%s content_length=%d errors=%s",
         request.url.path,
-        len(body),
+        int(content_length),
         exc.errors(),
     )
     
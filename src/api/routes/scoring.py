@@ -1,33 +1,30 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import partial
 from typing import Optional
+import asyncio
 import logging
-from datetime import datetime, timezone
 
 from src.api.schemas.payload import (
     ScoringRequest, ScoringResponse, ModelExplanations, PlannerAdvice,
     PlannerResult, RAGResult,
     ExternalPlanRequest, ExternalPlanResponse,
 )
-from src.db.database import get_db
-from src.db import models
+from src.db.database import get_async_db
+from src.services.audit_log import enqueue_audit
 from src.services.feature_merger import FeatureMergerService
 from src.services.model_runner import ModelRunnerService
+from src.services.result_writer import enqueue_result, upsert_result
 from src.planner.planning import generate_response
 from src.planner.rag_bridge import build_shap_json, build_user_input, extract_rag_sources, get_rag_manager, make_rag_lookup
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-async def _audit_log_async(payload: dict):
-    # Simulates pushing payload to a Kafka Topic or Elasticsearch
-    logger.info(f"[AUDIT LOG] Logged payload for request {payload.get('request_id')} at {datetime.now(timezone.utc).isoformat()}")
-
 @router.post("/score/request", response_model=ScoringResponse)
 async def request_credit_score(
     payload: ScoringRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     1. Receives strict JSON payload.
@@ -41,7 +38,7 @@ async def request_credit_score(
     
     try:
         # Step 1: Feature Merger (Querying DB and Feature Store)
-        merged_features = FeatureMergerService.merge_features(payload.customer_id, db)
+        merged_features = await FeatureMergerService.merge_features(payload.customer_id, db)
         
         # Step 2: Model Inference
         model_result = ModelRunnerService.run_inference(merged_features, payload)
@@ -65,7 +62,12 @@ async def request_credit_score(
                 },
             }
             shap_json = build_shap_json(model_result["shap_values"])
-            plan_result = generate_response(user_input, model_output, shap_json, rag_lookup=rag_lookup)
+            # Planner + RAG make blocking LLM/vector-store calls; run them in
+            # the default thread pool so the event loop keeps serving requests.
+            plan_result = await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(generate_response, user_input, model_output, shap_json, rag_lookup=rag_lookup),
+            )
 
             rag_sources = extract_rag_sources(plan_result)
 
@@ -105,31 +107,20 @@ async def request_credit_score(
         
         # Step 5: Persist to Operational DB
         # Idempotent write by request_id so repeated test runs don't fail with UNIQUE errors.
-        db_result = (
-            db.query(models.CreditScoreResult)
-            .filter(models.CreditScoreResult.request_id == response.request_id)
-            .first()
-        )
-        if db_result is None:
-            db_result = models.CreditScoreResult(
-                request_id=response.request_id,
-                customer_id=payload.customer_id,
-                approved=response.approved,
-                probability_score=response.probability_score,
-                is_thin_file=merged_features["is_thin_file"]
-            )
-            db.add(db_result)
-        else:
-            db_result.customer_id = payload.customer_id
-            db_result.approved = response.approved
-            db_result.probability_score = response.probability_score
-            db_result.is_thin_file = merged_features["is_thin_file"]
-
-        db.commit()
+        # Rows go to a batching writer; the response does not wait for the commit.
+        result_row = {
+            "request_id": response.request_id,
+            "customer_id": payload.customer_id,
+            "approved": response.approved,
+            "probability_score": response.probability_score,
+            "is_thin_file": merged_features["is_thin_file"],
+        }
+        if not enqueue_result(result_row):
+            await upsert_result(db, result_row)
+        FeatureMergerService.record_result(payload.customer_id, response.approved)
         
-        # Step 6: Dispatch Async tasks (Audit, saving to DB)
-        background_tasks.add_task(
-            _audit_log_async,
+        # Step 6: Queue the audit log; a single worker ships it in batches
+        enqueue_audit(
             {
                 "request_id": response.request_id,
                 "customer_id": payload.customer_id,
@@ -176,11 +167,15 @@ async def plan_from_external_model(payload: ExternalPlanRequest):
             "values": payload.shap_json.values,
         }
 
-        plan_result = generate_response(
-            user_input=user_input_dict,
-            model_output=model_output_dict,
-            shap_json=shap_json_dict,
-            rag_lookup=rag_lookup,
+        plan_result = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                generate_response,
+                user_input=user_input_dict,
+                model_output=model_output_dict,
+                shap_json=shap_json_dict,
+                rag_lookup=rag_lookup,
+            ),
         )
 
         rag_sources = extract_rag_sources(plan_result)
@@ -1,28 +1,31 @@
+import logging
+from decimal import Decimal
 from typing import Optional, Dict, Any, List, Union
-from pydantic import BaseModel, Field, conint, condecimal, field_validator
+from pydantic import BaseModel, Field, field_validator
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------------
 # Incoming Request Schemas
 # -----------------------------------
 
 class DemographicData(BaseModel):
-    age: conint(ge=18, le=120) = Field(..., description="Age of the applicant in years.")
+    age: int = Field(..., ge=18, le=120, description="Age of the applicant in years.")
     employment_status: str = Field(..., description="E.g., Employed, Self-Employed, Unemployed.")
     education_level: Optional[str] = Field("Unknown", description="E.g., Bachelor, Master, High School.")
     marital_status: Optional[str] = Field("Unknown", description="E.g., Single, Married.")
 
 class FinancialData(BaseModel):
-    monthly_income: condecimal(ge=0, decimal_places=2) = Field(..., description="Monthly income in local currency.")
-    monthly_expenses: condecimal(ge=0, decimal_places=2) = Field(..., description="Monthly expenses in local currency.")
-    existing_debt: condecimal(ge=0, decimal_places=2) = Field(0.00, description="Total existing debt.")
+    monthly_income: Decimal = Field(..., ge=0, decimal_places=2, description="Monthly income in local currency.")
+    monthly_expenses: Decimal = Field(..., ge=0, decimal_places=2, description="Monthly expenses in local currency.")
+    existing_debt: Decimal = Field(0.00, ge=0, decimal_places=2, description="Total existing debt.")
     
     @field_validator("monthly_expenses")
     @classmethod
     def check_expenses_vs_income(cls, v, info):
-        import logging as _logging
-        monthly_income = (info.data or {}).get("monthly_income")
+        monthly_income = info.data.get("monthly_income")
         if monthly_income is not None and v > monthly_income:
-            _logging.getLogger(__name__).warning(
+            logger.warning(
                 "monthly_expenses (%s) exceeds monthly_income (%s) — potential data entry error",
                 v,
                 monthly_income,
@@ -30,8 +33,8 @@ class FinancialData(BaseModel):
         return v
 
 class LoanRequestData(BaseModel):
-    loan_amount: condecimal(gt=0, decimal_places=2) = Field(..., description="Requested loan amount.")
-    loan_term_months: conint(gt=0, le=360) = Field(..., description="Duration of the loan in months.")
+    loan_amount: Decimal = Field(..., gt=0, decimal_places=2, description="Requested loan amount.")
+    loan_term_months: int = Field(..., gt=0, le=360, description="Duration of the loan in months.")
     loan_purpose: str = Field(..., description="E.g., Mortgage, Personal, Auto.")
 
 class ScoringRequest(BaseModel):
@@ -0,0 +1,72 @@
+"""
+ChromaDB client and collection setup for the VECTOR_STORE_TYPE=chroma path.
+
+Every builder and loader goes through here so they agree on where the store
+lives and how its HNSW graph is tuned:
+  - CHROMA_HOST unset: embedded PersistentClient at CHROMA_PERSIST_DIR
+  - CHROMA_HOST=host:port: HttpClient to a separate `chroma run` server, which
+    keeps HNSW search out of the API process
+  - CHROMA_HNSW_M / CHROMA_HNSW_EF_CONSTRUCTION are fixed when the collection is
+    created; CHROMA_HNSW_EF_SEARCH is also applied to existing collections on
+    load
+
+The distance space is left at Chroma's default (l2). BGE-M3 vectors are
+normalized, so ranking matches cosine, and the similarity cutoffs in
+QueryEngineManager are calibrated on the l2-derived scores.
+"""
+
+import logging
+from typing import Any, Dict
+
+import chromadb
+from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def chroma_client() -> ClientAPI:
+    """Return a client for the configured Chroma server or local store."""
+    if settings.CHROMA_HOST:
+        host, _, port = settings.CHROMA_HOST.rpartition(":")
+        if host and port.isdigit():
+            return chromadb.HttpClient(host=host, port=int(port))
+        return chromadb.HttpClient(host=settings.CHROMA_HOST)
+    return chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+
+
+def collection_metadata() -> Dict[str, Any]:
+    """HNSW parameters applied when the collection is created."""
+    return {
+        "hnsw:M": settings.CHROMA_HNSW_M,
+        "hnsw:construction_ef": settings.CHROMA_HNSW_EF_CONSTRUCTION,
+        "hnsw:search_ef": settings.CHROMA_HNSW_EF_SEARCH,
+    }
+
+
+def create_collection(client: ClientAPI) -> Collection:
+    """Get or create the configured collection with the tuned HNSW parameters."""
+    return client.get_or_create_collection(
+        settings.CHROMA_COLLECTION,
+        metadata=collection_metadata(),
+    )
+
+
+def open_collection(client: ClientAPI, create_missing: bool = False) -> Collection:
+    """Open the collection for querying, applying CHROMA_HNSW_EF_SEARCH."""
+    if create_missing:
+        collection = create_collection(client)
+    else:
+        collection = client.get_collection(settings.CHROMA_COLLECTION)
+    try:
+        hnsw = (collection.configuration or {}).get("hnsw") or {}
+        if hnsw and hnsw.get("ef_search") != settings.CHROMA_HNSW_EF_SEARCH:
+            # Collections built before the setting existed keep their old value.
+            collection.modify(
+                configuration={"hnsw": {"ef_search": settings.CHROMA_HNSW_EF_SEARCH}}
+            )
+    except Exception as exc:
+        logger.debug("Could not update Chroma ef_search: %s", exc)
+    return collection
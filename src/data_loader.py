@@ -7,22 +7,51 @@ from pathlib import Path
 from typing import List, Optional
 
 from llama_index.core import Document, SimpleDirectoryReader
-from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.node_parser import NodeParser, SentenceSplitter, TokenTextSplitter
 
 from config.settings import settings
 from src.document_parser import StructuredDocumentParser
+from src.parse_cache import ParseCache
 
 logger = logging.getLogger(__name__)
 
+_LOADER_EXTS = [".pdf", ".txt", ".docx", ".xlsx", ".csv"]
+
+
+def build_node_parser(chunk_size: int, chunk_overlap: int) -> NodeParser:
+    """
+    Chunker selected by CHUNK_SPLITTER.
+
+    "sentence" (default) packs whole sentences up to chunk_size tiktoken
+    tokens. "token" cuts fixed windows measured with the embedding model's
+    own fast (Rust) tokenizer, skipping sentence segmentation entirely.
+    """
+    if settings.CHUNK_SPLITTER == "token":
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(settings.EMBEDDING_MODEL, use_fast=True)
+        return TokenTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            tokenizer=lambda text: tokenizer.encode(text, add_special_tokens=False),
+        )
+    return SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def _read_file(file_path: Path) -> List[Document]:
+    """Parse one file with SimpleDirectoryReader (module-level so it pickles)."""
+    return SimpleDirectoryReader(input_files=[str(file_path)]).load_data()
+
+
 class DataLoader:
     """Handle loading and processing of documents"""
     
     def __init__(self):
         self.chunk_size = settings.CHUNK_SIZE
         self.chunk_overlap = settings.CHUNK_OVERLAP
-        self.node_parser = SentenceSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap
+        self.node_parser = build_node_parser(self.chunk_size, self.chunk_overlap)
+        self.parse_cache = (
+            ParseCache(settings.PARSE_CACHE_DIR) if settings.PARSE_CACHE_ENABLED else None
         )
     
     def load_documents_from_directory(
@@ -51,7 +80,9 @@ class DataLoader:
         
         try:
             # Try structured parser first
-            documents = StructuredDocumentParser.parse_directory(directory)
+            documents = StructuredDocumentParser.parse_directory(
+                directory, cache=self.parse_cache
+            )
             
             if documents:
                 report = StructuredDocumentParser.get_last_parse_report()
@@ -67,9 +98,13 @@ class DataLoader:
             reader = SimpleDirectoryReader(
                 input_dir=str(directory),
                 recursive=recursive,
-                required_exts=[".pdf", ".txt", ".docx", ".xlsx", ".csv"]
+                required_exts=_LOADER_EXTS
             )
-            documents = reader.load_data()
+            if self.parse_cache is not None:
+                per_file = self.parse_cache.map(reader.input_files, _read_file)
+                documents = [doc for docs in per_file for doc in docs]
+            else:
+                documents = reader.load_data()
             logger.info(f"Loaded {len(documents)} documents")
             return documents
         except Exception as e:
@@ -91,8 +126,10 @@ class DataLoader:
             return None
         
         try:
-            reader = SimpleDirectoryReader(input_files=[str(file_path)])
-            documents = reader.load_data()
+            if self.parse_cache is not None:
+                documents = self.parse_cache.map([file_path], _read_file, prune=False)[0]
+            else:
+                documents = _read_file(file_path)
             
             if documents:
                 logger.info(f"Loaded document: {file_path.name}")
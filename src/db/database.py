@@ -1,14 +1,60 @@
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from config.settings import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 _connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=_connect_args)
+# SQLite has no server-side connection limit; pool sizing only applies to
+# networked databases.
+_pool_kwargs = (
+    {}
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+    else {"pool_size": 20, "max_overflow": 10, "pool_pre_ping": True}
+)
+# One process-wide engine (and its pool) shared by every SessionLocal/get_db session.
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=_connect_args, **_pool_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the same database URL (sync URL stays the single setting).
+# aiosqlite is a core dependency; asyncpg comes with the `postgres` extra.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "sqlite+aiosqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "postgresql+asyncpg": "postgresql+asyncpg",
+}
+
+
+def _async_database_url(url: str):
+    """Map a sync SQLAlchemy URL onto its asyncio driver."""
+    parsed = make_url(url)
+    async_driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    if async_driver is None:
+        raise ValueError(
+            f"Unsupported DATABASE_URL driver '{parsed.drivername}'; "
+            f"use one of: {', '.join(sorted(_ASYNC_DRIVERS))}"
+        )
+    return parsed.set(drivername=async_driver)
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = _async_database_url(SQLALCHEMY_DATABASE_URL)
+
+# Batched result writes (src.services.result_writer) send up to 500 rows per
+# multi-VALUES INSERT.
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    insertmanyvalues_page_size=500,
+    **_pool_kwargs,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency for FastAPI
@@ -18,3 +64,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, Index
 from src.db.database import Base
 from datetime import datetime, timezone
 
@@ -7,7 +7,8 @@ class CreditScoreResult(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     request_id = Column(String, unique=True, index=True)
-    customer_id = Column(String, index=True)
+    # Indexed through ix_credit_score_results_customer_latest below.
+    customer_id = Column(String)
     
     # Model Outputs
     approved = Column(Boolean)
@@ -16,6 +17,25 @@ class CreditScoreResult(Base):
     
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        # Serves FeatureMergerService's latest-result lookup
+        # (customer_id = ? ORDER BY id DESC LIMIT 1) straight from the index;
+        # on Postgres INCLUDE makes it index-only.
+        Index(
+            "ix_credit_score_results_customer_latest",
+            "customer_id",
+            "id",
+            postgresql_include=["approved"],
+        ),
+    )
+
+
+def create_missing_indexes(connection) -> None:
+    """Create declared indexes absent from existing tables (create_all skips them)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -5,10 +5,13 @@ from __future__ import annotations
 import re
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from llama_index.core import Document
 
+if TYPE_CHECKING:
+    from src.parse_cache import ParseCache
+
 CLEANING_VERSION = "2026-03-04-v1"
 
 NOISE_TERMS = (
@@ -1329,15 +1332,30 @@ class StructuredDocumentParser:
         return "policy"
 
     @staticmethod
-    def parse_directory(directory: Path, include_quarantined: bool = False) -> List[Document]:
-        """Parse all .txt documents in a directory."""
+    def parse_directory(
+        directory: Path,
+        include_quarantined: bool = False,
+        cache: Optional[ParseCache] = None,
+    ) -> List[Document]:
+        """Parse all .txt documents in a directory.
+
+        With a ParseCache, unchanged files are loaded from it instead of
+        being re-parsed.
+        """
         documents: List[Document] = []
         quarantined_examples: List[Dict[str, str]] = []
         total_docs = 0
         quarantined_docs = 0
 
-        for file_path in sorted(directory.glob("*.txt")):
-            doc = StructuredDocumentParser.parse_file(file_path)
+        file_paths = sorted(directory.glob("*.txt"))
+        if cache is not None:
+            parsed = cache.map(
+                file_paths, StructuredDocumentParser.parse_file, version=CLEANING_VERSION
+            )
+        else:
+            parsed = [StructuredDocumentParser.parse_file(p) for p in file_paths]
+
+        for file_path, doc in zip(file_paths, parsed):
             if not doc:
                 continue
 
@@ -0,0 +1,5 @@
+"""Embedding model construction, optionally backed by a shared model server."""
+
+from .model_server import RemoteEmbedding, get_embed_model, has_query_instruction
+
+__all__ = ["RemoteEmbedding", "get_embed_model", "has_query_instruction"]
@@ -0,0 +1,203 @@
+"""
+Shared embedding model server.
+
+Loading BAAI/bge-m3 (~2 GB) dominates the wall time of short scripts. Run the
+server once and every process that calls `get_embed_model()` borrows the
+already-loaded model over a local socket instead of loading its own copy:
+
+    python -m src.embeddings.model_server
+
+Clients opt in by setting EMBED_SERVER_ADDRESS (host:port or a Unix socket
+path). If the server is unset or unreachable, `get_embed_model()` falls back
+to an in-process HuggingFaceEmbedding. Connections are authenticated with
+EMBED_SERVER_AUTHKEY, or with a random key the server generates for the
+current user when that is unset (see src.manager_auth).
+"""
+
+import functools
+import logging
+from multiprocessing.managers import BaseManager
+from typing import Any, List, Optional, Tuple, Union
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+from config.settings import settings
+from src.manager_auth import client_authkey, server_authkey
+
+logger = logging.getLogger(__name__)
+
+Address = Union[str, Tuple[str, int]]
+
+
+class _EmbeddingManager(BaseManager):
+    pass
+
+
+class _Encoder:
+    """Server-side wrapper around the loaded model; methods return plain lists."""
+
+    def __init__(self, embed_model: BaseEmbedding):
+        self._embed_model = embed_model
+
+    def model_name(self) -> str:
+        return self._embed_model.model_name
+
+    def embed_queries(self, queries: List[str]) -> List[Embedding]:
+        return [self._embed_model.get_query_embedding(q) for q in queries]
+
+    def embed_texts(self, texts: List[str]) -> List[Embedding]:
+        return self._embed_model.get_text_embedding_batch(texts, show_progress=False)
+
+
+def _parse_address(raw: str) -> Address:
+    """'host:port' -> TCP address; anything else is a Unix socket path."""
+    host, sep, port = raw.rpartition(":")
+    if sep and host and port.isdigit():
+        return host, int(port)
+    return raw
+
+
+def _cuda_available() -> bool:
+    try:
+        import torch
+    except ImportError:  # pragma: no cover - torch ships with sentence-transformers
+        return False
+    return torch.cuda.is_available()
+
+
+def default_embed_batch_size() -> int:
+    """EMBED_BATCH_SIZE, or 256 on CUDA / 32 on CPU when unset."""
+    if settings.EMBED_BATCH_SIZE > 0:
+        return settings.EMBED_BATCH_SIZE
+    # Large batches keep a GPU busy; on CPU they only add padding waste.
+    return 256 if _cuda_available() else 32
+
+
+def _load_local_model(embed_batch_size: Optional[int] = None, model_name: Optional[str] = None) -> BaseEmbedding:
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    model_kwargs: dict = {}
+    if settings.EMBED_BACKEND != "torch":
+        # Exported ONNX/OpenVINO graph via optimum (CPU inference).
+        model_kwargs["backend"] = settings.EMBED_BACKEND
+        if settings.EMBED_ONNX_FILE:
+            model_kwargs["model_kwargs"] = {"file_name": settings.EMBED_ONNX_FILE}
+    elif _cuda_available():
+        import torch
+
+        # FP16 halves weight memory and bandwidth on GPU; CPU stays FP32.
+        model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
+
+    return HuggingFaceEmbedding(
+        model_name=model_name or settings.EMBEDDING_MODEL,
+        embed_batch_size=embed_batch_size or default_embed_batch_size(),
+        **model_kwargs,
+    )
+
+
+class RemoteEmbedding(BaseEmbedding):
+    """LlamaIndex embedding that forwards batches to the shared model server."""
+
+    _encoder: Any = PrivateAttr()
+
+    def __init__(self, address: Address, authkey: bytes, embed_batch_size: int = 32):
+        manager = _EmbeddingManager(address=address, authkey=authkey)
+        manager.connect()
+        encoder = manager.encoder()
+        super().__init__(model_name=encoder.model_name(), embed_batch_size=embed_batch_size)
+        self._encoder = encoder
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "RemoteEmbedding"
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._encoder.embed_queries([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._encoder.embed_texts([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._encoder.embed_texts(texts)
+
+
+def get_embed_model(embed_batch_size: Optional[int] = None, model_name: Optional[str] = None) -> BaseEmbedding:
+    """
+    Return the configured embedding model, built once per process.
+
+    Uses the shared model server when EMBED_SERVER_ADDRESS is set and
+    reachable, otherwise loads HuggingFaceEmbedding in-process. Repeated
+    calls (index create/load, RAG manager, CLI query) reuse one instance
+    instead of reloading the weights. `embed_batch_size` defaults to
+    `default_embed_batch_size()`.
+    """
+    return _cached_embed_model(
+        model_name or settings.EMBEDDING_MODEL,
+        embed_batch_size or default_embed_batch_size(),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_embed_model(model_name: str, embed_batch_size: int) -> BaseEmbedding:
+    raw_address = settings.EMBED_SERVER_ADDRESS
+    if raw_address:
+        try:
+            model = RemoteEmbedding(
+                _parse_address(raw_address),
+                client_authkey(settings.EMBED_SERVER_AUTHKEY, "embed_server", "EMBED_SERVER_AUTHKEY"),
+                embed_batch_size=embed_batch_size,
+            )
+            if model.model_name == model_name:
+                logger.info("Using shared embedding server at %s", raw_address)
+                return model
+            logger.warning(
+                "Embedding server %s serves %s, not %s; loading model in-process",
+                raw_address,
+                model.model_name,
+                model_name,
+            )
+        except (OSError, EOFError) as exc:
+            logger.warning(
+                "Embedding server %s unavailable (%s); loading model in-process",
+                raw_address,
+                exc,
+            )
+    return _load_local_model(embed_batch_size, model_name)
+
+
+def has_query_instruction(embed_model: BaseEmbedding) -> bool:
+    """Whether queries are embedded differently from passages for this model."""
+    if getattr(embed_model, "query_instruction", None):
+        return True
+    try:
+        from llama_index.embeddings.huggingface.utils import get_query_instruct_for_model_name
+    except ImportError:
+        return False
+    return bool(get_query_instruct_for_model_name(embed_model.model_name))
+
+
+def serve(address: Optional[str] = None) -> None:
+    """Load the model once and serve it until interrupted."""
+    encoder = _Encoder(_load_local_model())
+    _EmbeddingManager.register("encoder", callable=lambda: encoder)
+
+    raw_address = address or settings.EMBED_SERVER_ADDRESS or "127.0.0.1:50055"
+    manager = _EmbeddingManager(
+        address=_parse_address(raw_address),
+        authkey=server_authkey(settings.EMBED_SERVER_AUTHKEY, "embed_server"),
+    )
+    server = manager.get_server()
+    logger.info("Serving %s at %s", settings.EMBEDDING_MODEL, raw_address)
+    server.serve_forever()
+
+
+_EmbeddingManager.register("encoder")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
@@ -0,0 +1,177 @@
+"""
+FAISS index construction for the VECTOR_STORE_TYPE=faiss path.
+
+FAISS_INDEX_TYPE selects the layout:
+  - flat:         exhaustive exact search, no training needed
+  - hnsw:         HNSW graph over full vectors; sub-linear search, no training
+                  needed (default)
+  - sq8:          exhaustive search over int8 scalar-quantized vectors (4x fewer
+                  bytes per scan than float32); trained on the corpus range
+  - hnsw_sq8:     HNSW graph over int8 scalar-quantized vectors
+  - ivfpq:        inverted file + product quantization; sub-linear search over
+                  compressed codes, trained on a sample of the corpus embeddings
+  - ivfpq_rerank: ivfpq shortlists FAISS_RERANK_FACTOR * k candidates, which
+                  are rescored against full-precision vectors (IndexRefineFlat)
+                  so the returned top-k carries exact distances
+"""
+
+import logging
+from typing import List, Optional
+
+import faiss
+import numpy as np
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# k-means wants roughly this many training points per centroid.
+_MIN_POINTS_PER_CENTROID = 39
+
+TRAINED_INDEX_TYPES = {"sq8", "hnsw_sq8", "ivfpq", "ivfpq_rerank"}
+
+
+def needs_training() -> bool:
+    """Whether the configured FAISS index must be trained before vectors are added."""
+    return settings.FAISS_INDEX_TYPE in TRAINED_INDEX_TYPES
+
+
+def _metric_type(metric: str) -> int:
+    return faiss.METRIC_INNER_PRODUCT if metric == "ip" else faiss.METRIC_L2
+
+
+def _flat_index(dim: int, metric: str) -> faiss.Index:
+    return faiss.IndexFlatIP(dim) if metric == "ip" else faiss.IndexFlatL2(dim)
+
+
+def _hnsw_index(dim: int, metric: str) -> faiss.Index:
+    index = faiss.IndexHNSWFlat(dim, settings.FAISS_HNSW_M, _metric_type(metric))
+    index.hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+    return index
+
+
+def _sq8_index(dim: int, embeddings: np.ndarray, metric: str) -> faiss.Index:
+    # Only the stored side is quantized; queries stay float32.
+    qtype = faiss.ScalarQuantizer.QT_8bit
+    if settings.FAISS_INDEX_TYPE == "hnsw_sq8":
+        index = faiss.IndexHNSWSQ(dim, qtype, settings.FAISS_HNSW_M, _metric_type(metric))
+        index.hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+    else:
+        index = faiss.IndexScalarQuantizer(dim, qtype, _metric_type(metric))
+    index.train(embeddings)
+    return index
+
+
+def _ivfpq_index(dim: int, embeddings: np.ndarray, metric: str) -> Optional[faiss.Index]:
+    n_vectors = embeddings.shape[0]
+    pq_m = settings.FAISS_PQ_M
+    nbits = settings.FAISS_PQ_NBITS
+    if dim % pq_m != 0:
+        logger.warning("FAISS_PQ_M=%d does not divide dim=%d; using flat index", pq_m, dim)
+        return None
+    if n_vectors < 2 ** nbits:
+        logger.warning(
+            "Only %d vectors, need >= %d to train PQ codebooks; using flat index",
+            n_vectors,
+            2 ** nbits,
+        )
+        return None
+
+    nlist = max(1, min(settings.FAISS_NLIST, n_vectors // _MIN_POINTS_PER_CENTROID))
+    quantizer = _flat_index(dim, metric)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, nbits, _metric_type(metric))
+    index.train(embeddings)
+    logger.info("Trained IVF-PQ index: nlist=%d m=%d nbits=%d on %d vectors", nlist, pq_m, nbits, n_vectors)
+    return index
+
+
+def build_faiss_index(
+    dim: int,
+    embeddings: Optional[np.ndarray] = None,
+    metric: str = "l2",
+) -> faiss.Index:
+    """
+    Build an empty FAISS index of the configured type.
+
+    Args:
+        dim: Embedding dimension
+        embeddings: Training sample, required for trained index types
+        metric: "l2" or "ip" (inner product)
+
+    Returns:
+        FAISS index ready for `add`
+    """
+    index = None
+    if settings.FAISS_INDEX_TYPE == "hnsw":
+        index = _hnsw_index(dim, metric)
+    elif needs_training():
+        if embeddings is None or len(embeddings) == 0:
+            logger.warning(
+                "FAISS_INDEX_TYPE=%s needs training embeddings; using flat index",
+                settings.FAISS_INDEX_TYPE,
+            )
+        else:
+            embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+            if settings.FAISS_INDEX_TYPE in ("sq8", "hnsw_sq8"):
+                index = _sq8_index(dim, embeddings, metric)
+            else:
+                index = _ivfpq_index(dim, embeddings, metric)
+                if index is not None and settings.FAISS_INDEX_TYPE == "ivfpq_rerank":
+                    index = faiss.IndexRefineFlat(index)
+
+    if index is None:
+        index = _flat_index(dim, metric)
+    configure_search(index)
+    return index
+
+
+def configure_search(index: faiss.Index) -> None:
+    """Apply query-time knobs (nprobe, efSearch, rerank factor); no-op for flat indexes."""
+    if isinstance(index, faiss.IndexRefine):
+        index.k_factor = float(settings.FAISS_RERANK_FACTOR)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = settings.FAISS_HNSW_EF_SEARCH
+        return
+    try:
+        faiss.extract_index_ivf(index).nprobe = settings.FAISS_NPROBE
+    except RuntimeError:
+        pass
+
+
+def _mmap_flags() -> int:
+    # IO_FLAG_MMAP maps IVF inverted lists; newer FAISS releases also expose
+    # IO_FLAG_MMAP_IFC, which maps the codes of flat/SQ/HNSW storage.
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    return flags | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+def read_index(path: str) -> faiss.Index:
+    """
+    Load a persisted index for querying.
+
+    With FAISS_MMAP the index is memory-mapped read-only, so cold start does
+    not copy the vectors into RAM and uvicorn workers share page-cache pages.
+    Query-time knobs are applied and one dummy search touches the hot pages.
+    """
+    flags = _mmap_flags() if settings.FAISS_MMAP else 0
+    index = faiss.read_index(path, flags)
+    configure_search(index)
+    if index.ntotal:
+        index.search(np.zeros((1, index.d), dtype="float32"), 1)
+    return index
+
+
+def embedding_dimension(embed_model) -> int:
+    """Return the output dimension of an embedding model (1024 for BGE-M3)."""
+    return len(embed_model.get_text_embedding("dimension probe"))
+
+
+def embed_nodes(nodes: List, embed_model) -> np.ndarray:
+    """Embed nodes in batches, attach the vectors, and return them as float32."""
+    from llama_index.core.schema import MetadataMode
+
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    vectors = embed_model.get_text_embedding_batch(texts, show_progress=False)
+    for node, vector in zip(nodes, vectors):
+        node.embedding = vector
+    return np.asarray(vectors, dtype="float32")
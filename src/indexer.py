@@ -8,15 +8,24 @@ from typing import Optional, List
 
 from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
 from llama_index.core.settings import Settings
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.vector_stores.faiss import FaissVectorStore
-import chromadb
-import faiss
+from chromadb.api import ClientAPI
 
 from config.settings import settings
+from src.chroma_index import chroma_client, create_collection, open_collection
 from src.data_loader import DataLoader
 from src.document_parser import CLEANING_VERSION
+from src.embeddings import get_embed_model
+from src.faiss_index import (
+    build_faiss_index,
+    embed_nodes,
+    embedding_dimension,
+    needs_training,
+    read_index,
+)
+from src.matrix_vector_store import MatrixVectorStore
+from src.rag.cache import get_retrieval_cache
 
 logger = logging.getLogger(__name__)
 
@@ -63,10 +72,7 @@ class IndexManager:
         logger.info(f"Creating index with {len(nodes)} nodes using {self.vector_store_type}")
         
         # BGE-M3 embeddings for Thai/multilingual support (1024 dim)
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name=settings.EMBEDDING_MODEL,
-            embed_batch_size=32,
-        )
+        Settings.embed_model = get_embed_model()
         
         # Create index based on vector store type
         if self.vector_store_type == "chroma":
@@ -80,10 +86,14 @@ class IndexManager:
             index = self._create_faiss_index(nodes)
         else:
             # Simple in-memory index
-            index = VectorStoreIndex(nodes)
+            storage_context = StorageContext.from_defaults(vector_store=MatrixVectorStore())
+            index = VectorStoreIndex(nodes=nodes, storage_context=storage_context)
         
         if persist:
             self._persist_index(index)
+
+        # Retrieved nodes cached against the previous index are now stale.
+        get_retrieval_cache().clear()
         
         logger.info("Index created successfully")
         if not self._verify_cleaning_fingerprint(index):
@@ -97,10 +107,10 @@ class IndexManager:
     def _create_chroma_index(self, nodes: List, reset_collection: bool = False) -> VectorStoreIndex:
         """Create index with Chroma vector store"""
         # Initialize Chroma client
-        chroma_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+        client = chroma_client()
         if reset_collection:
-            self._reset_chroma_collection(chroma_client)
-        chroma_collection = chroma_client.get_or_create_collection(settings.CHROMA_COLLECTION)
+            self._reset_chroma_collection(client)
+        chroma_collection = create_collection(client)
         
         # Create vector store
         vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
@@ -112,9 +122,19 @@ class IndexManager:
     
     def _create_faiss_index(self, nodes: List) -> VectorStoreIndex:
         """Create index with FAISS vector store"""
-        # Create FAISS index (1024 dim for BGE-M3)
-        d = Settings.embed_model.get_text_embedding_dimension()
-        faiss_index = faiss.IndexFlatL2(d)
+        # Trained layouts (FAISS_INDEX_TYPE=ivfpq) need the corpus vectors up
+        # front; nodes keep them so VectorStoreIndex does not re-embed.
+        train_embeddings = None
+        if needs_training():
+            train_embeddings = embed_nodes(nodes, Settings.embed_model)
+            d = train_embeddings.shape[1]
+        else:
+            # 1024 dim for BGE-M3
+            d = embedding_dimension(Settings.embed_model)
+        # BGE-M3 vectors are L2-normalized, so inner product is cosine
+        # similarity and FaissVectorStore scores come back higher-is-better,
+        # which the similarity cutoffs in QueryEngineManager assume.
+        faiss_index = build_faiss_index(d, train_embeddings, metric="ip")
         
         # Create vector store
         vector_store = FaissVectorStore(faiss_index=faiss_index)
@@ -146,7 +166,7 @@ class IndexManager:
         """
         if self.vector_store_type == "chroma":
             chroma_dir = Path(settings.CHROMA_PERSIST_DIR)
-            if not chroma_dir.exists():
+            if not settings.CHROMA_HOST and not chroma_dir.exists():
                 logger.warning(f"Chroma directory {chroma_dir} does not exist")
                 return None
         elif not self.index_dir.exists():
@@ -163,7 +183,8 @@ class IndexManager:
             else:
                 # Simple vector store
                 storage_context = StorageContext.from_defaults(
-                    persist_dir=str(self.index_dir)
+                    persist_dir=str(self.index_dir),
+                    vector_store=MatrixVectorStore.from_persist_dir(str(self.index_dir)),
                 )
                 index = load_index_from_storage(storage_context)
             
@@ -176,22 +197,25 @@ class IndexManager:
     def _load_chroma_index(self) -> VectorStoreIndex:
         """Load Chroma index"""
         # Must use same BGE-M3 embedding model for query encoding
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name=settings.EMBEDDING_MODEL,
-            embed_batch_size=32,
-        )
-        chroma_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
-        chroma_collection = chroma_client.get_or_create_collection(settings.CHROMA_COLLECTION)
+        Settings.embed_model = get_embed_model()
+        chroma_collection = open_collection(chroma_client(), create_missing=True)
         vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
         index = VectorStoreIndex.from_vector_store(vector_store)
         return index
     
     def _load_faiss_index(self) -> VectorStoreIndex:
         """Load FAISS index"""
-        faiss_index = faiss.read_index(str(self.index_dir / "faiss.index"))
+        # Must use same BGE-M3 embedding model for query encoding
+        Settings.embed_model = get_embed_model()
+        # FaissVectorStore.persist() writes the raw FAISS index under the
+        # default vector store file name; node text lives in the docstore.
+        faiss_index = read_index(str(self.index_dir / "default__vector_store.json"))
         vector_store = FaissVectorStore(faiss_index=faiss_index)
-        index = VectorStoreIndex.from_vector_store(vector_store)
-        return index
+        storage_context = StorageContext.from_defaults(
+            vector_store=vector_store,
+            persist_dir=str(self.index_dir),
+        )
+        return load_index_from_storage(storage_context)
     
     def rebuild_index(self) -> VectorStoreIndex:
         """
@@ -207,8 +231,7 @@ class IndexManager:
             self.vector_store_type == "chroma"
             and settings.RESET_CHROMA_COLLECTION_ON_INGEST
         ):
-            chroma_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
-            self._reset_chroma_collection(chroma_client)
+            self._reset_chroma_collection(chroma_client())
 
         # Clear existing index directory
         if self.index_dir.exists():
@@ -217,10 +240,10 @@ class IndexManager:
 
         return self.create_index()
 
-    def _reset_chroma_collection(self, chroma_client: chromadb.PersistentClient) -> None:
+    def _reset_chroma_collection(self, client: ClientAPI) -> None:
         """Delete existing Chroma collection if present."""
         try:
-            chroma_client.delete_collection(settings.CHROMA_COLLECTION)
+            client.delete_collection(settings.CHROMA_COLLECTION)
             logger.info(
                 "Deleted existing Chroma collection '%s' before rebuild",
                 settings.CHROMA_COLLECTION,
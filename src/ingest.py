@@ -6,12 +6,12 @@ if not hasattr(_np, "float_"):
     _np.float_ = _np.float64  # type: ignore
 
 from llama_index.core import StorageContext, VectorStoreIndex
-from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.settings import Settings
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.vector_stores.chroma import ChromaVectorStore
 
+from src.data_loader import build_node_parser
 from src.document_parser import CLEANING_VERSION, StructuredDocumentParser
+from src.embeddings import get_embed_model
+from src.parse_cache import ParseCache
 
 try:
     from config.settings import settings
@@ -26,6 +26,7 @@ try:
     OLLAMA_BASE_URL = settings.OLLAMA_BASE_URL
     OLLAMA_MODEL = settings.OLLAMA_MODEL
     VECTOR_STORE_TYPE = settings.VECTOR_STORE_TYPE
+    PARSE_CACHE_DIR = settings.PARSE_CACHE_DIR if settings.PARSE_CACHE_ENABLED else None
 except ImportError:  # pragma: no cover - script execution fallback
     from src.settings import (
         CHROMA_COLLECTION,
@@ -42,35 +43,59 @@ except ImportError:  # pragma: no cover - script execution fallback
     RESET_CHROMA_COLLECTION_ON_INGEST = (
         os.getenv("RESET_CHROMA_COLLECTION_ON_INGEST", "true").lower() == "true"
     )
+    PARSE_CACHE_DIR = None
 
 
-def _get_storage_context() -> StorageContext:
-    if VECTOR_STORE_TYPE == "chroma":
-        import chromadb
-        os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
-        client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+def _chroma_storage_context(train_embeddings=None) -> StorageContext:
+    from llama_index.vector_stores.chroma import ChromaVectorStore
+    from src.chroma_index import chroma_client, create_collection
 
-        if RESET_CHROMA_COLLECTION_ON_INGEST:
-            try:
-                client.delete_collection(CHROMA_COLLECTION)
-                print(f"Deleted existing Chroma collection: {CHROMA_COLLECTION}")
-            except Exception:
-                pass
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    client = chroma_client()
 
-        collection = client.get_or_create_collection(CHROMA_COLLECTION)
-        vector_store = ChromaVectorStore(chroma_collection=collection)
-        return StorageContext.from_defaults(vector_store=vector_store)
+    if RESET_CHROMA_COLLECTION_ON_INGEST:
+        try:
+            client.delete_collection(CHROMA_COLLECTION)
+            print(f"Deleted existing Chroma collection: {CHROMA_COLLECTION}")
+        except Exception:
+            pass
 
-    # Default to FAISS for backward compatibility when not using Chroma.
+    collection = create_collection(client)
+    vector_store = ChromaVectorStore(chroma_collection=collection)
+    return StorageContext.from_defaults(vector_store=vector_store)
+
+
+def _faiss_storage_context(train_embeddings=None) -> StorageContext:
     from llama_index.vector_stores.faiss import FaissVectorStore
-    import faiss
+    from src.faiss_index import build_faiss_index, embedding_dimension
+
     os.makedirs(INDEX_DIR, exist_ok=True)
-    dim = Settings.embed_model.get_text_embedding_dimension()
-    faiss_index = faiss.IndexFlatIP(dim)
+    if train_embeddings is not None:
+        dim = train_embeddings.shape[1]
+    else:
+        dim = embedding_dimension(Settings.embed_model)
+    faiss_index = build_faiss_index(dim, train_embeddings, metric="ip")
     vector_store = FaissVectorStore(faiss_index=faiss_index)
     return StorageContext.from_defaults(vector_store=vector_store)
 
 
+# Each builder imports its own backend, so an ingest run only loads
+# chromadb or faiss, never both. FAISS stays the default for backward
+# compatibility when not using Chroma.
+_STORAGE_CONTEXT_BUILDERS = {"chroma": _chroma_storage_context}
+
+
+def _get_storage_context(train_embeddings=None) -> StorageContext:
+    build = _STORAGE_CONTEXT_BUILDERS.get(VECTOR_STORE_TYPE, _faiss_storage_context)
+    return build(train_embeddings)
+
+
+def _faiss_needs_training() -> bool:
+    from src.faiss_index import needs_training
+
+    return needs_training()
+
+
 def _verify_cleaning_fingerprint(index: VectorStoreIndex) -> bool:
     """Verify that nodes in the index were produced by the current parser version.
 
@@ -106,7 +131,8 @@ def build_index() -> None:
         f"{RESET_CHROMA_COLLECTION_ON_INGEST}"
     )
 
-    docs = StructuredDocumentParser.parse_directory(Path(DATA_DIR))
+    parse_cache = ParseCache(PARSE_CACHE_DIR) if PARSE_CACHE_DIR else None
+    docs = StructuredDocumentParser.parse_directory(Path(DATA_DIR), cache=parse_cache)
     if not docs:
         raise RuntimeError(f"No documents found in {DATA_DIR}")
 
@@ -129,22 +155,26 @@ def build_index() -> None:
             reason = str(item.get("reason", "unknown"))
             print(f"  - {title} | reason={reason}")
 
-    splitter = SentenceSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-    )
-    Settings.embed_model = HuggingFaceEmbedding(
-        model_name=EMBED_MODEL,
-        embed_batch_size=32,
-    )
+    splitter = build_node_parser(CHUNK_SIZE, CHUNK_OVERLAP)
+    Settings.embed_model = get_embed_model(model_name=EMBED_MODEL)
     Settings.node_parser = splitter
 
-    storage_context = _get_storage_context()
+    if VECTOR_STORE_TYPE != "chroma" and _faiss_needs_training():
+        # Trained FAISS layouts (FAISS_INDEX_TYPE=ivfpq) need the corpus
+        # vectors before the index exists; nodes keep them for insertion.
+        from src.faiss_index import embed_nodes
 
-    index = VectorStoreIndex.from_documents(
-        docs,
-        storage_context=storage_context,
-    )
+        nodes = splitter.get_nodes_from_documents(docs)
+        train_embeddings = embed_nodes(nodes, Settings.embed_model)
+        storage_context = _get_storage_context(train_embeddings)
+        index = VectorStoreIndex(nodes, storage_context=storage_context)
+    else:
+        storage_context = _get_storage_context()
+
+        index = VectorStoreIndex.from_documents(
+            docs,
+            storage_context=storage_context,
+        )
 
     # Keep a local persisted context for non-Chroma stores.
     if VECTOR_STORE_TYPE != "chroma":
@@ -0,0 +1,59 @@
+"""
+Auth keys and per-user paths for the local multiprocessing.managers servers.
+
+Manager connections exchange pickles, so whoever holds a server's authkey can
+run code in it. The key therefore never has a built-in default: it comes from
+the environment (EMBED_SERVER_AUTHKEY / EXPLAIN_SERVER_AUTHKEY) or, when that
+is unset, from a random key the server writes to a 0600 file in a per-user
+directory, where clients of the same user pick it up.
+"""
+
+import os
+import secrets
+import sys
+from pathlib import Path
+
+
+def runtime_dir() -> Path:
+    """Private per-user directory for key files and Unix sockets."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    else:
+        base = Path(os.environ.get("XDG_RUNTIME_DIR") or Path.home() / ".cache")
+    path = base / "ai-credit-scoring"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return path
+
+
+def _key_file(name: str) -> Path:
+    return runtime_dir() / f"{name}.key"
+
+
+def server_authkey(configured: str, name: str) -> bytes:
+    """Key for a server: the configured one, else the per-user generated key."""
+    if configured:
+        return configured.encode()
+    path = _key_file(name)
+    try:
+        # O_EXCL: concurrent first starts agree on a single key.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return path.read_bytes().strip()
+    key = secrets.token_hex(32).encode()
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(key)
+    return key
+
+
+def client_authkey(configured: str, name: str, env_var: str) -> bytes:
+    """Key for a client: the configured one, else the key its server generated."""
+    if configured:
+        return configured.encode()
+    path = _key_file(name)
+    try:
+        return path.read_bytes().strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No {env_var} set and no generated key at {path}; "
+            "start the server as this user or set the key in both processes"
+        ) from None
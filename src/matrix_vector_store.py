@@ -0,0 +1,83 @@
+"""
+In-memory vector store for VECTOR_STORE_TYPE=simple.
+
+LlamaIndex's SimpleVectorStore rebuilds a NumPy array from its embedding dict
+and scores it row by row in Python on every query. MatrixVectorStore keeps the
+vectors as one contiguous, L2-normalized float32 matrix (rebuilt lazily after
+writes) so cosine scoring is a single BLAS matrix-vector product and top-k is
+an argpartition instead of a heap walk.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.simple import SimpleVectorStore
+from llama_index.core.vector_stores.types import (
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+
+class MatrixVectorStore(SimpleVectorStore):
+    """SimpleVectorStore with a cached (N, D) float32 matrix for default-mode queries."""
+
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)
+    _matrix_ids: List[str] = PrivateAttr(default_factory=list)
+
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> List[str]:
+        self._matrix = None
+        return super().add(nodes, **add_kwargs)
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        self._matrix = None
+        super().delete(ref_doc_id, **delete_kwargs)
+
+    def delete_nodes(self, *args: Any, **kwargs: Any) -> None:
+        self._matrix = None
+        super().delete_nodes(*args, **kwargs)
+
+    def clear(self) -> None:
+        self._matrix = None
+        super().clear()
+
+    def _get_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            embedding_dict = self.data.embedding_dict
+            self._matrix_ids = list(embedding_dict.keys())
+            matrix = np.asarray(list(embedding_dict.values()), dtype=np.float32)
+            if matrix.ndim == 2:
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                matrix /= norms
+            self._matrix = np.ascontiguousarray(matrix)
+        return self._matrix
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        # Filtered, id-restricted and learner/MMR queries keep the stock path.
+        if (
+            query.mode != VectorStoreQueryMode.DEFAULT
+            or query.filters is not None
+            or query.node_ids is not None
+            or query.query_embedding is None
+        ):
+            return super().query(query, **kwargs)
+
+        matrix = self._get_matrix()
+        if matrix.ndim != 2 or matrix.shape[0] == 0:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+
+        query_vec = np.ascontiguousarray(query.query_embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query_vec)) or 1.0
+        similarities = (matrix @ query_vec) / query_norm
+
+        top_k = min(query.similarity_top_k or len(similarities), len(similarities))
+        top_idx = np.argpartition(similarities, -top_k)[-top_k:]
+        top_idx = top_idx[np.argsort(similarities[top_idx])[::-1]]
+
+        return VectorStoreQueryResult(
+            similarities=similarities[top_idx].tolist(),
+            ids=[self._matrix_ids[i] for i in top_idx],
+        )
@@ -0,0 +1,135 @@
+"""
+On-disk cache of parsed documents.
+
+Re-parsing every file on each rebuild is the slow part of ingest once the
+corpus grows. ParseCache pickles each file's parse result under a key built
+from (path, mtime_ns, size) plus the parser's identity, source file stamp
+and an optional caller-supplied version (e.g. CLEANING_VERSION), so an
+incremental rebuild only re-parses files that changed, and editing the
+parser itself invalidates its entries. Each parser gets its own
+subdirectory, and a full `map()` deletes the entries there that it did not
+use, so stale parses do not pile up. Cache misses are parsed in a process
+pool because the parsers are pure-Python and hold the GIL.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Below this many misses a process pool costs more to start than it saves.
+_MIN_PARALLEL_MISSES = 8
+
+
+def _file_stamp(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _parser_name(parse_fn: Callable[..., Any]) -> str:
+    return f"{parse_fn.__module__}.{parse_fn.__qualname__}"
+
+
+def _parser_id(parse_fn: Callable[..., Any], version: str = "") -> str:
+    module = sys.modules.get(parse_fn.__module__)
+    module_file = getattr(module, "__file__", None)
+    stamp = _file_stamp(Path(module_file)) if module_file else ""
+    return f"{_parser_name(parse_fn)}@{stamp}:{version}"
+
+
+class ParseCache:
+    """Pickle-per-file cache for `parse_fn(path)` results."""
+
+    def __init__(self, cache_dir: Path, max_workers: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def _parser_dir(self, parse_fn: Callable[..., Any]) -> Path:
+        name = hashlib.blake2b(_parser_name(parse_fn).encode(), digest_size=8).hexdigest()
+        return self.cache_dir / name
+
+    @staticmethod
+    def _entry_path(parser_dir: Path, path: Path, parser_id: str) -> Path:
+        raw = f"{parser_id}:{path.resolve()}:{_file_stamp(path)}"
+        return parser_dir / f"{hashlib.blake2b(raw.encode()).hexdigest()}.pkl"
+
+    @staticmethod
+    def _prune(parser_dir: Path, keep: Sequence[Path]) -> None:
+        keep_names = {entry.name for entry in keep}
+        removed = 0
+        for entry in parser_dir.glob("*.pkl"):
+            if entry.name not in keep_names:
+                entry.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("Parse cache: pruned %d stale entries", removed)
+
+    def _load(self, entry: Path) -> Any:
+        try:
+            with entry.open("rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            raise KeyError(entry) from None
+        except Exception as exc:
+            logger.warning("Discarding unreadable parse cache entry %s: %s", entry.name, exc)
+            raise KeyError(entry) from exc
+
+    def _store(self, entry: Path, value: Any) -> None:
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with tmp.open("wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except Exception as exc:
+            logger.warning("Could not write parse cache entry %s: %s", entry.name, exc)
+            tmp.unlink(missing_ok=True)
+
+    def map(
+        self,
+        paths: Sequence[Path],
+        parse_fn: Callable[[Path], Any],
+        version: str = "",
+        prune: bool = True,
+    ) -> List[Any]:
+        """Return `[parse_fn(p) for p in paths]`, reusing cached results.
+
+        `version` is mixed into the key for state the parser depends on
+        outside its own module. With `prune`, `paths` is taken to be the
+        parser's whole corpus and its other entries are deleted; pass
+        `prune=False` when mapping a subset, such as a single file.
+        """
+        parser_dir = self._parser_dir(parse_fn)
+        parser_dir.mkdir(parents=True, exist_ok=True)
+        parser_id = _parser_id(parse_fn, version)
+        entries = [self._entry_path(parser_dir, Path(p), parser_id) for p in paths]
+
+        results: Dict[int, Any] = {}
+        misses: List[int] = []
+        for i, entry in enumerate(entries):
+            try:
+                results[i] = self._load(entry)
+            except KeyError:
+                misses.append(i)
+
+        if misses:
+            miss_paths = [Path(paths[i]) for i in misses]
+            if len(misses) >= _MIN_PARALLEL_MISSES and self.max_workers > 1:
+                workers = min(self.max_workers, len(misses))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    parsed = list(pool.map(parse_fn, miss_paths))
+            else:
+                parsed = [parse_fn(p) for p in miss_paths]
+            for i, value in zip(misses, parsed):
+                results[i] = value
+                self._store(entries[i], value)
+
+        if prune:
+            self._prune(parser_dir, entries)
+        logger.info("Parse cache: %d hit(s), %d parsed", len(paths) - len(misses), len(misses))
+        return [results[i] for i in range(len(paths))]
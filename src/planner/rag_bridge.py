@@ -129,21 +129,17 @@ def get_rag_manager() -> Optional[Any]:
         if _manager is not None:
             return None if _manager is _UNAVAILABLE else _manager
         try:
-            import chromadb
             from llama_index.core import VectorStoreIndex
             from llama_index.core.settings import Settings
-            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
             from llama_index.vector_stores.chroma import ChromaVectorStore
 
             from config.settings import settings as cfg
+            from src.chroma_index import chroma_client, open_collection
+            from src.embeddings import get_embed_model
             from src.query_engine import QueryEngineManager
 
-            Settings.embed_model = HuggingFaceEmbedding(
-                model_name=cfg.EMBEDDING_MODEL,
-                embed_batch_size=32,
-            )
-            client = chromadb.PersistentClient(path=cfg.CHROMA_PERSIST_DIR)
-            collection = client.get_collection(cfg.CHROMA_COLLECTION)
+            Settings.embed_model = get_embed_model()
+            collection = open_collection(chroma_client())
             vector_store = ChromaVectorStore(chroma_collection=collection)
             index = VectorStoreIndex.from_vector_store(vector_store)
             _manager = QueryEngineManager(index)
@@ -1,12 +1,20 @@
 ﻿"""Query and chat engines for LlamaIndex."""
 
+import asyncio
+import hashlib
+import itertools
 import logging
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
+import httpx
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.llms.generic_utils import messages_to_history_str
+from llama_index.core.base.llms.types import ChatMessage
 from llama_index.core.chat_engine import CondenseQuestionChatEngine, SimpleChatEngine
 from llama_index.core.postprocessor import SimilarityPostprocessor
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
@@ -18,9 +26,13 @@ from llama_index.core.schema import NodeWithScore, QueryBundle
 from llama_index.core.settings import Settings
 from llama_index.core.vector_stores.types import MetadataFilters
 from llama_index.llms.ollama import Ollama
+from ollama import AsyncClient, Client
+from pydantic import BaseModel, Field
 
 from config.settings import settings
 from src.document_parser import CLEANING_VERSION
+from src.embeddings import has_query_instruction
+from src.rag.cache import get_condense_cache, get_retrieval_cache
 from src.rag.logging import log_rag_debug_event, log_retrieval_event
 from src.rag.router import build_metadata_filters, metadata_matches_route, route_query
 from src.rag.validator import (
@@ -117,6 +129,19 @@ def _extract_node_metadata(node: Any) -> Dict[str, Any]:
     return {}
 
 
+def _truncate(text: str, max_len: int) -> str:
+    return text[:max_len] + "..." if len(text) > max_len else text
+
+
+def _source_info(node: Any, max_len: int = 200) -> Dict[str, Any]:
+    """Caller-facing summary of one source node: text snippet, metadata, score."""
+    return {
+        "content": _truncate(_extract_node_text(node), max_len),
+        "metadata": format_source_display(_extract_node_metadata(node)),
+        "score": getattr(node, "score", None),
+    }
+
+
 def _nodes_to_log_records(nodes: List[Any]) -> List[Dict[str, Any]]:
     """Convert nodes to structured logging entries."""
     records = []
@@ -146,13 +171,6 @@ def _nodes_to_debug_records(nodes: List[Any], limit: int = 25) -> List[Dict[str,
     return records
 
 
-def _env_flag(name: str, default: bool = False) -> bool:
-    value = os.getenv(name)
-    if value is None:
-        return default
-    return value.strip().lower() in {"1", "true", "yes", "on"}
-
-
 def _route_cutoff(router_label: str, configured_cutoff: float) -> float:
     route_caps = {
         "interest_structure": 0.20,
@@ -501,6 +519,88 @@ class RelevanceValidatorPostprocessor(BaseNodePostprocessor):
         return sorted(validated, key=_safe_score, reverse=True)
 
 
+SUGGESTION_BATCH_TEMPLATE = PromptTemplate(
+    """For each of the following topics, generate {num_suggestions} specific and useful
+questions that would be good for querying a document database. Make the questions
+specific and actionable. Return one entry per topic, using the topic text exactly as given.
+
+Topics:
+{topics}"""
+)
+
+
+class TopicSuggestions(BaseModel):
+    topic: str
+    questions: List[str] = Field(default_factory=list)
+
+
+class SuggestionBatch(BaseModel):
+    items: List[TopicSuggestions] = Field(default_factory=list)
+
+
+def _condense_cache_key(chat_history: List[ChatMessage], last_message: str) -> str:
+    history_digest = hashlib.sha1(messages_to_history_str(chat_history).encode("utf-8")).hexdigest()
+    return f"{history_digest}|{last_message}"
+
+
+class CachedCondenseQuestionChatEngine(CondenseQuestionChatEngine):
+    """
+    CondenseQuestionChatEngine that memoizes standalone-question rewrites.
+
+    Replaying a conversation (same history, same message) reuses the earlier
+    rewrite instead of another LLM round-trip. First turns have no history
+    and are passed through without an LLM call, as upstream does.
+    """
+
+    def _condense_question(self, chat_history: List[ChatMessage], last_message: str) -> str:
+        if not chat_history:
+            return last_message
+        cache = get_condense_cache()
+        key = _condense_cache_key(chat_history, last_message)
+        condensed = cache.get(key)
+        if condensed is None:
+            condensed = super()._condense_question(chat_history, last_message)
+            cache.set(key, condensed)
+        return condensed
+
+    async def _acondense_question(
+        self, chat_history: List[ChatMessage], last_message: str
+    ) -> str:
+        if not chat_history:
+            return last_message
+        cache = get_condense_cache()
+        key = _condense_cache_key(chat_history, last_message)
+        condensed = cache.get(key)
+        if condensed is None:
+            condensed = await super()._acondense_question(chat_history, last_message)
+            cache.set(key, condensed)
+        return condensed
+
+
+_QUERY_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_query_executor_lock = threading.Lock()
+
+# Scopes the shared retrieval cache per manager (and per index revision), so
+# managers over different indexes never see each other's nodes.
+_RETRIEVAL_SCOPES = itertools.count()
+
+
+def _get_query_executor() -> ThreadPoolExecutor:
+    """Shared pool for `QueryEngineManager.aquery`; created on first use."""
+    global _QUERY_EXECUTOR
+    if _QUERY_EXECUTOR is None:
+        with _query_executor_lock:
+            if _QUERY_EXECUTOR is None:
+                _QUERY_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 4,
+                    thread_name_prefix="rag-query",
+                )
+    return _QUERY_EXECUTOR
+
+
+_OLLAMA_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+
 def _build_llm():
     """
     LLM factory — single place to swap providers.
@@ -538,6 +638,18 @@ def _build_llm():
             base_url=settings.OLLAMA_BASE_URL,
             temperature=0.1,
             request_timeout=120.0,
+            # One pooled keep-alive client per LLM (sync and async), reused by
+            # every query/chat call.
+            client=Client(
+                host=settings.OLLAMA_BASE_URL,
+                timeout=120.0,
+                limits=_OLLAMA_HTTP_LIMITS,
+            ),
+            async_client=AsyncClient(
+                host=settings.OLLAMA_BASE_URL,
+                timeout=120.0,
+                limits=_OLLAMA_HTTP_LIMITS,
+            ),
             context_window=settings.OLLAMA_NUM_CTX,
             additional_kwargs={
                 "num_ctx": settings.OLLAMA_NUM_CTX,
@@ -564,6 +676,10 @@ class QueryEngineManager:
     def __init__(self, index: VectorStoreIndex):
         self.index = index
         self._bm25_nodes_cache: Optional[List] = None
+        # Query engines are stateless, so one per configuration is reused
+        # (see create_query_engine); chat engines keep memory and are not.
+        self._engine_cache: Dict[tuple, RetrieverQueryEngine] = {}
+        self._retrieval_scope = next(_RETRIEVAL_SCOPES)
 
         self.llm = _build_llm()
 
@@ -629,7 +745,7 @@ class QueryEngineManager:
 
         vector_retriever = VectorIndexRetriever(**retriever_kwargs)
 
-        if not _env_flag("RAG_HYBRID_SEARCH", default=False):
+        if not settings.RAG_HYBRID_SEARCH:
             return vector_retriever
 
         try:
@@ -691,6 +807,19 @@ class QueryEngineManager:
         similarity_top_k = similarity_top_k or self.similarity_top_k
         response_mode = response_mode or self.response_mode
 
+        cache_key = (
+            similarity_top_k,
+            response_mode,
+            use_postprocessor,
+            router_label,
+            metadata_filters.model_dump_json() if metadata_filters is not None else None,
+            settings.RAG_HYBRID_SEARCH,
+            settings.RAG_DISABLE_SIM_CUTOFF,
+        )
+        cached_engine = self._engine_cache.get(cache_key)
+        if cached_engine is not None:
+            return cached_engine
+
         logger.info(
             "Creating query engine with top_k=%s, mode=%s, route=%s",
             similarity_top_k,
@@ -713,7 +842,7 @@ class QueryEngineManager:
             MetadataRoutePostprocessor(router_label=router_label),
             RelevanceValidatorPostprocessor(router_label=router_label),
         ]
-        disable_sim_cutoff = _env_flag("RAG_DISABLE_SIM_CUTOFF", default=False)
+        disable_sim_cutoff = settings.RAG_DISABLE_SIM_CUTOFF
         if use_postprocessor and not disable_sim_cutoff:
             adaptive_cutoff = _route_cutoff(router_label, self.similarity_cutoff)
             postprocessors.append(SimilarityPostprocessor(similarity_cutoff=adaptive_cutoff))
@@ -727,7 +856,7 @@ class QueryEngineManager:
             node_postprocessors=postprocessors,
         )
 
-        return query_engine
+        return self._engine_cache.setdefault(cache_key, query_engine)
 
     def create_chat_engine(
         self,
@@ -754,7 +883,7 @@ class QueryEngineManager:
             # Create query engine for chat
             query_engine = self.create_query_engine(similarity_top_k=similarity_top_k)
 
-            chat_engine = CondenseQuestionChatEngine.from_defaults(
+            chat_engine = CachedCondenseQuestionChatEngine.from_defaults(
                 query_engine=query_engine, llm=self.llm, verbose=verbose
             )
         elif chat_mode == "simple":
@@ -775,6 +904,7 @@ class QueryEngineManager:
         similarity_top_k: Optional[int] = None,
         response_mode: Optional[str] = None,
         include_sources: bool = True,
+        query_embedding: Optional[List[float]] = None,
     ) -> Dict[str, Any]:
         """
         Query the index
@@ -784,6 +914,8 @@ class QueryEngineManager:
             similarity_top_k: Number of similar documents to retrieve
             response_mode: Response synthesis mode
             include_sources: Whether to include source information
+            query_embedding: Precomputed embedding of `question` (see
+                `embed_queries`); skips the embedding forward pass
 
         Returns:
             Dictionary with response and metadata
@@ -791,11 +923,9 @@ class QueryEngineManager:
         router_label = route_query(question)
         metadata_filters = build_metadata_filters(router_label)
         requested_top_k = similarity_top_k or self.similarity_top_k
-        # Tunable via env so low-RAM machines can shrink the LLM prompt.
-        # Defaults: retrieve 12 candidates, synthesize from top 3 — keeps prompt small.
-        retrieval_top_k = int(os.getenv("RAG_RETRIEVAL_TOP_K", "12"))
-        final_top_k = int(os.getenv("RAG_FINAL_TOP_K", "3"))
-        disable_sim_cutoff = _env_flag("RAG_DISABLE_SIM_CUTOFF", default=False)
+        retrieval_top_k = settings.RAG_RETRIEVAL_TOP_K
+        final_top_k = settings.RAG_FINAL_TOP_K
+        disable_sim_cutoff = settings.RAG_DISABLE_SIM_CUTOFF
         route_cutoff = _route_cutoff(router_label, self.similarity_cutoff)
 
         logger.info("Querying: %s (route=%s)", question, router_label)
@@ -821,14 +951,34 @@ class QueryEngineManager:
 
         retriever = getattr(query_engine, "retriever", None)
         synthesizer = getattr(query_engine, "response_synthesizer", None)
+        query_input: Any = (
+            QueryBundle(query_str=question, embedding=query_embedding)
+            if query_embedding is not None
+            else question
+        )
 
-        try:
-            if retriever is not None and hasattr(retriever, "retrieve"):
-                maybe_nodes = retriever.retrieve(question)
-                if isinstance(maybe_nodes, (list, tuple)):
-                    retrieved_nodes = list(maybe_nodes)
-        except Exception as exc:  # pragma: no cover - logging best effort
-            logger.debug("Unable to capture pre-filter retrieval nodes: %s", exc)
+        # A caller-supplied embedding may differ from the one the cached nodes
+        # came from, so those queries always hit the retriever.
+        retrieval_cache = get_retrieval_cache() if query_embedding is None else None
+        cache_key = f"{self._retrieval_scope}|{question}"
+        cached_nodes = (
+            retrieval_cache.get(cache_key, top_k=retrieval_top_k)
+            if retrieval_cache is not None
+            else None
+        )
+        if cached_nodes is not None:
+            logger.debug("Retrieval cache hit: %r", question[:60])
+            retrieved_nodes = list(cached_nodes)
+        else:
+            try:
+                if retriever is not None and hasattr(retriever, "retrieve"):
+                    maybe_nodes = retriever.retrieve(query_input)
+                    if isinstance(maybe_nodes, (list, tuple)):
+                        retrieved_nodes = list(maybe_nodes)
+            except Exception as exc:  # pragma: no cover - logging best effort
+                logger.debug("Unable to capture pre-filter retrieval nodes: %s", exc)
+            if retrieved_nodes and retrieval_cache is not None:
+                retrieval_cache.set(cache_key, tuple(retrieved_nodes), top_k=retrieval_top_k)
 
         if retrieved_nodes:
             if router_label == "general_info":
@@ -894,7 +1044,7 @@ class QueryEngineManager:
                 response = NO_ANSWER_MESSAGE
                 answer_text = NO_ANSWER_MESSAGE
             else:
-                response = query_engine.query(question)
+                response = query_engine.query(query_input)
                 source_nodes = getattr(response, "source_nodes", []) or []
                 answer_text = _normalize_answer_text(str(response), question, source_nodes)
 
@@ -942,17 +1092,7 @@ class QueryEngineManager:
         }
 
         if include_sources and source_nodes:
-            sources = []
-            for node in source_nodes:
-                text = _extract_node_text(node)
-                metadata = _extract_node_metadata(node)
-                source_info = {
-                    "content": text[:200] + "..." if len(text) > 200 else text,
-                    "metadata": format_source_display(metadata),
-                    "score": getattr(node, "score", None),
-                }
-                sources.append(source_info)
-            result["sources"] = sources
+            result["sources"] = [_source_info(node) for node in source_nodes]
 
         final_context_char_count = _final_context_char_count(source_nodes)
         used_fingerprint_found = any(_node_has_fingerprint(node) for node in source_nodes)
@@ -969,7 +1109,7 @@ class QueryEngineManager:
         }
         log_rag_debug_event(rag_debug_event)
 
-        if _env_flag("RAG_DEBUG", default=False):
+        if settings.RAG_DEBUG:
             print(
                 "[RAG_DEBUG] "
                 f"route={router_label} before={len(retrieved_nodes)} "
@@ -1030,20 +1170,96 @@ class QueryEngineManager:
 
         # Add source information if available
         if hasattr(response, "source_nodes"):
-            sources = []
-            for node in response.source_nodes:
-                text = _extract_node_text(node)
-                metadata = _extract_node_metadata(node)
-                source_info = {
-                    "content": text[:200] + "..." if len(text) > 200 else text,
-                    "metadata": format_source_display(metadata),
-                    "score": getattr(node, "score", None),
-                }
-                sources.append(source_info)
-            result["sources"] = sources
+            result["sources"] = [_source_info(node) for node in response.source_nodes]
 
         return result
 
+    async def aquery(self, question: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Async variant of `query` for running independent questions concurrently.
+
+        The pipeline (embedding, Chroma lookup, Ollama synthesis) is blocking,
+        so it runs on a shared thread pool; accepts the same keyword arguments
+        as `query`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_query_executor(),
+            lambda: self.query(question, **kwargs),
+        )
+
+    async def aquery_many(
+        self,
+        questions: List[str],
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """
+        Answer several questions concurrently, embedding them in one batch.
+
+        The questions are encoded with a single `embed_queries` call and each
+        is then run through `aquery` with its precomputed embedding. Accepts
+        the same keyword arguments as `query` (except `query_embedding`);
+        results are returned in input order. With `return_exceptions`, a
+        failed question yields its exception instead of failing the batch.
+        """
+        if not questions:
+            return []
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(
+            _get_query_executor(),
+            self.embed_queries,
+            list(questions),
+        )
+        return await asyncio.gather(
+            *[
+                self.aquery(question, query_embedding=embedding, **kwargs)
+                for question, embedding in zip(questions, embeddings)
+            ],
+            return_exceptions=return_exceptions,
+        )
+
+    async def achat(self, message: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Async variant of `chat`; runs on the same shared pool as `aquery` and
+        accepts the same keyword arguments as `chat`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_query_executor(),
+            lambda: self.chat(message, **kwargs),
+        )
+
+    def embed_queries(self, questions: List[str]) -> List[List[float]]:
+        """
+        Embed several questions up front for reuse via `query(query_embedding=...)`.
+
+        Args:
+            questions: Query questions
+
+        Returns:
+            One embedding per question, in order
+        """
+        embed_model = Settings.embed_model
+        if has_query_instruction(embed_model):
+            # Asymmetric models embed queries differently from passages.
+            return [embed_model.get_query_embedding(q) for q in questions]
+        return embed_model.get_text_embedding_batch(questions, show_progress=False)
+
+    def insert_nodes(self, nodes: List[Any]) -> None:
+        """Add nodes to the index and drop this manager's cached retrievals."""
+        self.index.insert_nodes(nodes)
+        # Hybrid engines hold a BM25 retriever built from the old node list.
+        self._bm25_nodes_cache = None
+        self._engine_cache.clear()
+        # A fresh scope makes the old entries unreachable; they age out of
+        # the shared cache by LRU/TTL.
+        self._retrieval_scope = next(_RETRIEVAL_SCOPES)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return statistics for the retrieval-stage cache used by `query`."""
+        return get_retrieval_cache().stats()
+
     def get_query_suggestions(self, topic: str, num_suggestions: int = 5) -> List[str]:
         """
         Get query suggestions based on a topic
@@ -1070,6 +1286,43 @@ class QueryEngineManager:
             logger.error("Error generating suggestions: %s", e)
             return []
 
+    def get_query_suggestions_batch(
+        self,
+        topics: List[str],
+        num_suggestions: int = 5,
+    ) -> Dict[str, List[str]]:
+        """
+        Get query suggestions for several topics with a single LLM call
+
+        Args:
+            topics: Topics to generate suggestions for
+            num_suggestions: Number of suggestions per topic
+
+        Returns:
+            Mapping of topic to suggested queries; topics the structured reply
+            misses fall back to `get_query_suggestions`
+        """
+        suggestions: Dict[str, List[str]] = {}
+        try:
+            batch = self.llm.structured_predict(
+                SuggestionBatch,
+                SUGGESTION_BATCH_TEMPLATE,
+                num_suggestions=num_suggestions,
+                topics="\n".join(f"- {topic}" for topic in topics),
+            )
+            by_topic = {item.topic.strip().lower(): item.questions for item in batch.items}
+            for topic in topics:
+                questions = [q.strip() for q in by_topic.get(topic.lower(), []) if q.strip()]
+                if questions:
+                    suggestions[topic] = questions[:num_suggestions]
+        except Exception as e:
+            logger.warning("Batched suggestion call failed, falling back per topic: %s", e)
+
+        for topic in topics:
+            if topic not in suggestions:
+                suggestions[topic] = self.get_query_suggestions(topic, num_suggestions)
+        return suggestions
+
     def explain_response(self, response) -> Dict[str, Any]:
         """
         Explain the response with detailed information
@@ -1090,14 +1343,14 @@ class QueryEngineManager:
             explanation["sources"] = []
 
             for i, node in enumerate(response.source_nodes):
-                text = _extract_node_text(node)
-                metadata = _extract_node_metadata(node)
-                source_info = {
-                    "index": i,
-                    "content_preview": text[:100] + "..." if len(text) > 100 else text,
-                    "metadata": format_source_display(metadata),
-                    "score": getattr(node, "score", None),
-                }
-                explanation["sources"].append(source_info)
+                info = _source_info(node, max_len=100)
+                explanation["sources"].append(
+                    {
+                        "index": i,
+                        "content_preview": info["content"],
+                        "metadata": info["metadata"],
+                        "score": info["score"],
+                    }
+                )
 
         return explanation
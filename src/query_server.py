@@ -0,0 +1,119 @@
+"""
+Long-lived explain_case server.
+
+Importing LlamaIndex, loading BGE-M3 and opening the vector store take
+seconds before `explain_case` can answer anything, which dominates one-shot
+CLI runs. Start the server once and it keeps that state warm:
+
+    python -m src.query_server
+
+Clients call `explain_case_remote()`, which imports nothing heavier than
+pydantic and talks to the server over a local socket (EXPLAIN_SERVER_ADDRESS:
+host:port or a Unix socket path; by default a socket in the per-user runtime
+directory, or 127.0.0.1:50056 on Windows). Connections are authenticated with
+EXPLAIN_SERVER_AUTHKEY, or with a key the server generates for the current
+user when that is unset:
+
+    python -m src.query_server --ask "Summarize rationale" case.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+from multiprocessing.managers import BaseManager
+from typing import Optional, Tuple, Union
+
+from config.settings import settings
+from src.manager_auth import client_authkey, runtime_dir, server_authkey
+from src.schema import AssistantResponse
+
+logger = logging.getLogger(__name__)
+
+Address = Union[str, Tuple[str, int]]
+
+_KEY_NAME = "explain_server"
+
+
+class _ExplainManager(BaseManager):
+    pass
+
+
+class _Explainer:
+    """Server-side wrapper; returns plain dicts so clients need no LlamaIndex."""
+
+    def explain(self, question: str, decision_json: dict) -> dict:
+        from src.query import explain_case
+
+        return explain_case(question, decision_json).model_dump()
+
+
+def _parse_address(raw: str) -> Address:
+    # Same format as EMBED_SERVER_ADDRESS; kept local so clients skip the
+    # embeddings package import.
+    host, sep, port = raw.rpartition(":")
+    if sep and host and port.isdigit():
+        return host, int(port)
+    return raw
+
+
+def _default_address() -> str:
+    if sys.platform == "win32":
+        # multiprocessing has no Unix sockets on Windows; stay on loopback.
+        return "127.0.0.1:50056"
+    return str(runtime_dir() / "explain.sock")
+
+
+def explain_case_remote(
+    question: str,
+    decision_json: dict,
+    address: Optional[str] = None,
+) -> AssistantResponse:
+    """Run explain_case on the warm server at EXPLAIN_SERVER_ADDRESS."""
+    manager = _ExplainManager(
+        address=_parse_address(address or settings.EXPLAIN_SERVER_ADDRESS or _default_address()),
+        authkey=client_authkey(settings.EXPLAIN_SERVER_AUTHKEY, _KEY_NAME, "EXPLAIN_SERVER_AUTHKEY"),
+    )
+    manager.connect()
+    data = manager.explainer().explain(question, decision_json)
+    return AssistantResponse.model_validate(data)
+
+
+def serve(address: Optional[str] = None) -> None:
+    """Warm the engine once and serve explain_case until interrupted."""
+    from src.query import get_engine
+
+    get_engine(top_k=10)
+    explainer = _Explainer()
+    _ExplainManager.register("explainer", callable=lambda: explainer)
+
+    raw_address = address or settings.EXPLAIN_SERVER_ADDRESS or _default_address()
+    manager = _ExplainManager(
+        address=_parse_address(raw_address),
+        authkey=server_authkey(settings.EXPLAIN_SERVER_AUTHKEY, _KEY_NAME),
+    )
+    server = manager.get_server()
+    logger.info("Serving explain_case at %s", raw_address)
+    server.serve_forever()
+
+
+_ExplainManager.register("explainer")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="explain_case server / client")
+    parser.add_argument("--address", default=None, help="host:port or Unix socket path")
+    parser.add_argument("--ask", metavar="QUESTION", help="Query a running server instead of serving")
+    parser.add_argument("decision_json", nargs="?", help="Path to the decision JSON (with --ask)")
+    args = parser.parse_args()
+
+    if args.ask:
+        if not args.decision_json:
+            parser.error("--ask needs a decision_json file")
+        with open(args.decision_json, encoding="utf-8") as fh:
+            decision = json.load(fh)
+        resp = explain_case_remote(args.ask, decision, address=args.address)
+        print(resp.model_dump_json(indent=2, ensure_ascii=False))
+    else:
+        logging.basicConfig(level=logging.INFO)
+        serve(args.address)
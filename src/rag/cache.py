@@ -10,6 +10,13 @@ Usage:
     if result is None:
         result = expensive_rag_call(question)
         cache.set(question, result, top_k=5)
+
+A second, shorter-lived singleton (`get_retrieval_cache`) memoizes the
+retrieval stage only (query embedding + vector search), so the same question
+re-synthesized with a different response mode skips the embedder.
+`get_condense_cache` holds condense-question rewrites for chat engines, keyed
+by the conversation so far plus the new message. `get_explain_cache` holds
+`explain_case` answers keyed by a hash of the question and decision payload.
 """
 from __future__ import annotations
 
@@ -21,6 +28,10 @@ from typing import Any, Optional
 
 _DEFAULT_MAX_SIZE = 256
 _DEFAULT_TTL_SECONDS = 3600.0  # 1 hour
+_RETRIEVAL_MAX_SIZE = 512
+_RETRIEVAL_TTL_SECONDS = 300.0  # 5 minutes
+_CONDENSE_MAX_SIZE = 256
+_EXPLAIN_MAX_SIZE = 1024
 
 
 @dataclass
@@ -44,11 +55,19 @@ class QueryCache:
     - **LRU eviction**: least-recently-used entry is dropped when `max_size` is exceeded.
     - **TTL expiry**: entries are considered stale after `ttl_seconds` and treated as misses.
     - **Thread-safe**: a single lock guards all state mutations.
+    - **Key normalization**: questions are lowercased and whitespace-collapsed;
+      pass `normalize_keys=False` for case-sensitive identifiers.
     """
 
-    def __init__(self, max_size: int = _DEFAULT_MAX_SIZE, ttl_seconds: float = _DEFAULT_TTL_SECONDS) -> None:
+    def __init__(
+        self,
+        max_size: int = _DEFAULT_MAX_SIZE,
+        ttl_seconds: float = _DEFAULT_TTL_SECONDS,
+        normalize_keys: bool = True,
+    ) -> None:
         self.max_size = max_size
         self.ttl = ttl_seconds
+        self.normalize_keys = normalize_keys
         self._store: OrderedDict[str, tuple[Any, float]] = OrderedDict()
         self._lock = threading.Lock()
         self._stats = _CacheStats()
@@ -109,9 +128,8 @@ class QueryCache:
 
     # ── Internals ─────────────────────────────────────────────────────────────
 
-    @staticmethod
-    def _make_key(question: str, top_k: Optional[int]) -> str:
-        normalized = " ".join(question.lower().split())
+    def _make_key(self, question: str, top_k: Optional[int]) -> str:
+        normalized = " ".join(question.lower().split()) if self.normalize_keys else question
         return f"{normalized}|{top_k}"
 
 
@@ -123,3 +141,27 @@ _cache = QueryCache(max_size=_DEFAULT_MAX_SIZE, ttl_seconds=_DEFAULT_TTL_SECONDS
 def get_cache() -> QueryCache:
     """Return the global RAG query cache singleton."""
     return _cache
+
+
+_retrieval_cache = QueryCache(max_size=_RETRIEVAL_MAX_SIZE, ttl_seconds=_RETRIEVAL_TTL_SECONDS)
+
+
+def get_retrieval_cache() -> QueryCache:
+    """Return the retrieved-nodes cache singleton used by QueryEngineManager."""
+    return _retrieval_cache
+
+
+_condense_cache = QueryCache(max_size=_CONDENSE_MAX_SIZE, ttl_seconds=_DEFAULT_TTL_SECONDS)
+
+
+def get_condense_cache() -> QueryCache:
+    """Return the condense-question rewrite cache singleton used by chat engines."""
+    return _condense_cache
+
+
+_explain_cache = QueryCache(max_size=_EXPLAIN_MAX_SIZE, ttl_seconds=_DEFAULT_TTL_SECONDS)
+
+
+def get_explain_cache() -> QueryCache:
+    """Return the explain_case response cache singleton."""
+    return _explain_cache
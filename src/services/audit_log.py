@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bounded so a stalled sink applies backpressure (drops) instead of growing memory.
+_AUDIT_QUEUE_MAXSIZE = 10_000
+# Max payloads emitted per sink call.
+_AUDIT_BATCH_SIZE = 100
+
+# Queued by stop_audit_worker after the last payload; the worker flushes its
+# current batch and returns when it reaches it.
+_STOP: Dict[str, Any] = {}
+
+_queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+_worker: Optional["asyncio.Task[None]"] = None
+
+
+def _flush(batch: List[Dict[str, Any]]) -> None:
+    # Simulates one produce call to a Kafka Topic or Elasticsearch bulk index
+    logger.info(
+        "[AUDIT LOG] Logged %d payload(s): %s",
+        len(batch),
+        ", ".join(f"{p.get('request_id')}@{p.get('logged_at')}" for p in batch),
+    )
+
+
+async def _audit_worker(queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+    stopping = False
+    while not stopping:
+        payload = await queue.get()
+        if payload is _STOP:
+            return
+        batch = [payload]
+        while len(batch) < _AUDIT_BATCH_SIZE and not queue.empty():
+            payload = queue.get_nowait()
+            if payload is _STOP:
+                stopping = True
+                break
+            batch.append(payload)
+        try:
+            _flush(batch)
+        except Exception as exc:  # pragma: no cover - sink failures must not kill the worker
+            logger.error("Audit log flush failed for %d payload(s): %s", len(batch), exc)
+
+
+def start_audit_worker() -> None:
+    """Create the audit queue and its single consumer on the running loop."""
+    global _queue, _worker
+    _queue = asyncio.Queue(maxsize=_AUDIT_QUEUE_MAXSIZE)
+    _worker = asyncio.create_task(_audit_worker(_queue), name="audit-log-worker")
+
+
+async def stop_audit_worker() -> None:
+    """Stop the consumer once it has flushed every queued payload."""
+    global _queue, _worker
+    queue, worker = _queue, _worker
+    # New payloads are logged inline from here on.
+    _queue = None
+    _worker = None
+    if worker is not None and queue is not None:
+        if not worker.done():
+            # Behind every accepted payload, so nothing the worker holds is dropped.
+            await queue.put(_STOP)
+        try:
+            await worker
+        except Exception as exc:
+            logger.error("Audit log worker failed: %s", exc)
+    if queue is not None:
+        # Only non-empty if the worker died early.
+        pending = []
+        while not queue.empty():
+            payload = queue.get_nowait()
+            if payload is not _STOP:
+                pending.append(payload)
+        if pending:
+            _flush(pending)
+
+
+def enqueue_audit(payload: Dict[str, Any]) -> None:
+    """Queue an audit payload; a single put on the request path."""
+    payload = {**payload, "logged_at": datetime.now(timezone.utc).isoformat()}
+    if _queue is None:
+        # Worker not running (e.g. app used without its lifespan): log inline.
+        _flush([payload])
+        return
+    try:
+        _queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        logger.warning("Audit queue full, dropping payload for request %s", payload.get("request_id"))
@@ -1,53 +1,106 @@
 import logging
 from typing import Dict, Any
 
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.db.models import CreditScoreResult
+from src.rag.cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
+# Built once at import: the statement object is reused on every request, so
+# SQLAlchemy's compiled cache hits instead of rebuilding the query AST, and
+# only the one column that is read gets fetched (no ORM entity hydration).
+_LATEST_RESULT_STMT = (
+    select(CreditScoreResult.approved)
+    .where(CreditScoreResult.customer_id == bindparam("customer_id"))
+    .order_by(CreditScoreResult.id.desc())
+    .limit(1)
+)
+
+_FEATURE_CACHE_MAX_SIZE = 10_000
+# The cache is per process: with several uvicorn/gunicorn workers, a result
+# scored by one worker is not seen by the others until their entry expires, so
+# a returning customer can still look thin-file there for up to this long.
+# This worker's own results are written through immediately (record_result).
+_FEATURE_CACHE_TTL_SECONDS = 60.0
+
+_feature_cache = QueryCache(
+    max_size=_FEATURE_CACHE_MAX_SIZE,
+    ttl_seconds=_FEATURE_CACHE_TTL_SECONDS,
+    normalize_keys=False,
+)
+
+
+def _known_customer_features(approved_history: Any) -> Dict[str, Any]:
+    # Populate from the most recent DB record.
+    # TODO: extend with credit bureau and feature store queries.
+    return {
+        "historical_defaults": 0 if approved_history else 1,
+        "credit_bureau_score": 700,  # placeholder until bureau API is integrated
+        "credit_grade": "BB",        # placeholder
+        "outstanding": 0.0,
+        "overdue_amount": 0.0,
+        "has_coapplicant": False,
+        "is_thin_file": False,
+        "months_since_last_delinquency": 36,
+    }
+
+
+def _thin_file_features() -> Dict[str, Any]:
+    # Thin-file: no history found — impute conservative defaults
+    return {
+        "historical_defaults": -1,   # Unknown
+        "credit_bureau_score": 600,  # Median default
+        "credit_grade": "CC",        # Median grade imputed
+        "outstanding": 0.0,
+        "overdue_amount": 0.0,
+        "has_coapplicant": False,
+        "is_thin_file": True,
+        "months_since_last_delinquency": -1,
+    }
+
+
 class FeatureMergerService:
     @staticmethod
-    def merge_features(customer_id: str, db_session: Any) -> Dict[str, Any]:
+    async def merge_features(customer_id: str, db_session: AsyncSession) -> Dict[str, Any]:
         """
         Queries the operational DB for customer history, then returns merged
         features for the scoring model.
 
         If the customer has no prior records, they are flagged as `is_thin_file`
-        and conservative baseline features are imputed.
+        and conservative baseline features are imputed. Results are cached
+        per customer_id for a short TTL.
         """
+        cached = _feature_cache.get(customer_id)
+        if cached is not None:
+            return dict(cached)
+
         logger.info(f"Merging features for customer_id: {customer_id}")
 
-        prior_record = (
-            db_session.query(CreditScoreResult)
-            .filter(CreditScoreResult.customer_id == customer_id)
-            .order_by(CreditScoreResult.id.desc())
-            .first()
+        result = await db_session.execute(
+            _LATEST_RESULT_STMT, {"customer_id": customer_id}
         )
-        is_known = prior_record is not None
-
-        if is_known:
-            # Populate from the most recent DB record.
-            # TODO: extend with credit bureau and feature store queries.
-            approved_history = prior_record.approved
-            return {
-                "historical_defaults": 0 if approved_history else 1,
-                "credit_bureau_score": 700,  # placeholder until bureau API is integrated
-                "credit_grade": "BB",        # placeholder
-                "outstanding": 0.0,
-                "overdue_amount": 0.0,
-                "has_coapplicant": False,
-                "is_thin_file": False,
-                "months_since_last_delinquency": 36,
-            }
+        prior_record = result.first()
+
+        if prior_record is not None:
+            features = _known_customer_features(prior_record.approved)
         else:
-            # Thin-file: no history found — impute conservative defaults
-            return {
-                "historical_defaults": -1,   # Unknown
-                "credit_bureau_score": 600,  # Median default
-                "credit_grade": "CC",        # Median grade imputed
-                "outstanding": 0.0,
-                "overdue_amount": 0.0,
-                "has_coapplicant": False,
-                "is_thin_file": True,
-                "months_since_last_delinquency": -1,
-            }
+            features = _thin_file_features()
+        _feature_cache.set(customer_id, features)
+        return dict(features)
+
+    @staticmethod
+    def record_result(customer_id: str, approved: bool) -> None:
+        """Write a new scoring result through to the feature cache.
+
+        Call alongside persisting a CreditScoreResult so the next lookup sees
+        the customer as known even before the batched write commits.
+        """
+        _feature_cache.set(customer_id, _known_customer_features(approved))
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop every cached feature set (app startup/shutdown and tests)."""
+        _feature_cache.clear()
@@ -1,6 +1,8 @@
-import math
 import logging
 from typing import Dict, Any
+
+import numpy as np
+
 from src.api.schemas.payload import ScoringRequest
 
 logger = logging.getLogger(__name__)
@@ -54,8 +56,10 @@ _NEUTRAL = {
 _SALARY_REF = 150_000.0
 
 
-def _sigmoid(x: float) -> float:
-    return 1.0 / (1.0 + math.exp(-x))
+def _lookup(keys: np.ndarray, table: Dict[str, float], default: float) -> np.ndarray:
+    """Map an array of category labels through `table`, once per distinct label."""
+    uniq, inverse = np.unique(keys.astype(str), return_inverse=True)
+    return np.array([table.get(k, default) for k in uniq], dtype=np.float64)[inverse]
 
 
 class ModelRunnerService:
@@ -83,54 +87,77 @@ class ModelRunnerService:
         """
         logger.info("Running model inference for request: %s", payload.request_id)
 
-        # ---------------------------------------------------------------
-        # Feature extraction
-        # ---------------------------------------------------------------
-        credit_score    = float(merged_features.get("credit_bureau_score", 600))
-        credit_grade    = str(merged_features.get("credit_grade", "CC")).upper()
-        outstanding     = float(merged_features.get("outstanding", 0.0))
-        overdue         = float(merged_features.get("overdue_amount", 0.0))
-        has_coapplicant = bool(merged_features.get("has_coapplicant", False))
-        is_thin_file    = bool(merged_features.get("is_thin_file", True))
-
-        salary          = float(payload.financials.monthly_income)
-        loan_amount     = float(payload.loan_details.loan_amount)
-        # API stores term in months; convert to years for LTI
-        loan_term_years = max(float(payload.loan_details.loan_term_months) / 12.0, 0.1)
-        occupation      = payload.demographics.employment_status
-
-        # ---------------------------------------------------------------
-        # Derived features
-        # ---------------------------------------------------------------
+        # Score as a one-row batch so the formula lives in one place.
+        result = ModelRunnerService.run_inference_batch({
+            "credit_bureau_score": np.array([merged_features.get("credit_bureau_score", 600)]),
+            "credit_grade":        np.array([str(merged_features.get("credit_grade", "CC"))]),
+            "outstanding":         np.array([merged_features.get("outstanding", 0.0)]),
+            "overdue_amount":      np.array([merged_features.get("overdue_amount", 0.0)]),
+            "has_coapplicant":     np.array([bool(merged_features.get("has_coapplicant", False))]),
+            "is_thin_file":        np.array([bool(merged_features.get("is_thin_file", True))]),
+            "monthly_income":      np.array([payload.financials.monthly_income]),
+            "loan_amount":         np.array([payload.loan_details.loan_amount]),
+            "loan_term_months":    np.array([payload.loan_details.loan_term_months]),
+            "employment_status":   np.array([str(payload.demographics.employment_status)]),
+        })
+
+        # Feature names match planner's DRIVER_QUERY_MAP & FEATURE_LABELS_TH
+        shap_values: Dict[str, float] = {
+            feature: float(result[f"shap_{feature}"][0])
+            for feature in (
+                "credit_score", "credit_grade", "outstanding", "overdue",
+                "loan_amount", "loan_term", "Salary",
+            )
+        }
+
+        return {
+            "approved": bool(result["approved"][0]),
+            "probability_score": float(result["probability_score"][0]),
+            "shap_values": shap_values,
+        }
+
+    @staticmethod
+    def run_inference_batch(features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Vectorised scoring model behind `run_inference`, for many applicants at once.
+
+        `features` holds one equal-length array per column: credit_bureau_score,
+        credit_grade, outstanding, overdue_amount, has_coapplicant,
+        is_thin_file (the merged features) plus monthly_income, loan_amount,
+        loan_term_months and employment_status (from the request payload).
+
+        Returns arrays keyed like `run_inference`'s result, with each SHAP
+        value under "shap_<feature>".
+        """
+        credit_score    = np.asarray(features["credit_bureau_score"], dtype=np.float64)
+        credit_grade    = np.char.upper(np.asarray(features["credit_grade"]).astype(str))
+        outstanding     = np.asarray(features["outstanding"], dtype=np.float64)
+        overdue         = np.asarray(features["overdue_amount"], dtype=np.float64)
+        has_coapplicant = np.asarray(features["has_coapplicant"], dtype=bool)
+        is_thin_file    = np.asarray(features["is_thin_file"], dtype=bool)
+
+        salary          = np.asarray(features["monthly_income"], dtype=np.float64)
+        loan_amount     = np.asarray(features["loan_amount"], dtype=np.float64)
+        loan_term_years = np.maximum(np.asarray(features["loan_term_months"], dtype=np.float64) / 12.0, 0.1)
+        occupation      = np.asarray(features["employment_status"])
+
         annual_income = salary * 12.0
         # Loan-to-income ratio: loan vs total income over term
-        lti = loan_amount / max(salary * loan_term_years, 1.0)
+        lti = loan_amount / np.maximum(salary * loan_term_years, 1.0)
 
-        # ---------------------------------------------------------------
         # Normalized component scores [0, 1]  (0 = safe, 1 = risky)
-        # ---------------------------------------------------------------
         # credit_score: 750+ → 0.0 (safe), 400 → 1.0 (risky)
-        cs_norm    = max(0.0, min(1.0, (750.0 - credit_score) / 350.0))
-        grade_norm = _GRADE_RISK.get(credit_grade, _GRADE_NEUTRAL)
+        cs_norm     = np.clip((750.0 - credit_score) / 350.0, 0.0, 1.0)
+        grade_norm  = _lookup(credit_grade, _GRADE_RISK, _GRADE_NEUTRAL)
         # outstanding as fraction of 2× annual income
-        out_norm   = min(1.0, outstanding / max(annual_income * 2.0, 1.0))
+        out_norm    = np.minimum(1.0, outstanding / np.maximum(annual_income * 2.0, 1.0))
         # overdue days, normalized to 90-day window
-        ov_norm    = min(1.0, overdue / 90.0)
+        ov_norm     = np.minimum(1.0, overdue / 90.0)
         # LTI > 3 = very risky territory
-        lti_norm   = min(1.0, lti / 3.0)
+        lti_norm    = np.minimum(1.0, lti / 3.0)
         # Low salary relative to reference = higher risk
-        salary_norm = max(0.0, min(1.0, 1.0 - salary / _SALARY_REF))
-
-        # ---------------------------------------------------------------
-        # Occupation & file adjustments (direct additions to base_risk)
-        # ---------------------------------------------------------------
-        occ_adj         = _OCCUPATION_ADJ.get(occupation, 0.0)
-        thin_file_adj   = 0.08 if is_thin_file else 0.0
-        coapplicant_adj = -0.05 if has_coapplicant else 0.0
-
-        # ---------------------------------------------------------------
-        # Weighted risk score
-        # ---------------------------------------------------------------
+        salary_norm = np.clip(1.0 - salary / _SALARY_REF, 0.0, 1.0)
+
         base_risk = (
             _W["credit_score"] * cs_norm
             + _W["credit_grade"] * grade_norm
@@ -138,41 +165,26 @@ class ModelRunnerService:
             + _W["overdue"]      * ov_norm
             + _W["lti"]          * lti_norm
             + _W["salary_level"] * salary_norm
-            + occ_adj
-            + thin_file_adj
-            + coapplicant_adj
+            + _lookup(occupation, _OCCUPATION_ADJ, 0.0)
+            + np.where(is_thin_file, 0.08, 0.0)
+            + np.where(has_coapplicant, -0.05, 0.0)
         )
-        base_risk = max(0.05, min(0.95, base_risk))
-
+        base_risk = np.clip(base_risk, 0.05, 0.95)
         # Sigmoid calibration centred at 0.35
-        logit     = 4.5 * (base_risk - 0.35)
-        risk_prob = _sigmoid(logit)
+        risk_prob = 1.0 / (1.0 + np.exp(-4.5 * (base_risk - 0.35)))
 
-        # ---------------------------------------------------------------
-        # Pseudo-SHAP values (deviation from neutral baseline)
-        # Positive = increases risk (bad), Negative = decreases risk (good)
-        # Feature names match planner's DRIVER_QUERY_MAP & FEATURE_LABELS_TH
-        # ---------------------------------------------------------------
-        def _shap(weight: float, actual: float, neutral: float) -> float:
-            return round(weight * (actual - neutral), 4)
-
-        lti_shap = _shap(_W["lti"], lti_norm, _NEUTRAL["lti"])
-
-        shap_values: Dict[str, float] = {
-            "credit_score": _shap(_W["credit_score"], cs_norm,     _NEUTRAL["credit_score"]),
-            "credit_grade": _shap(_W["credit_grade"], grade_norm,  _NEUTRAL["credit_grade"]),
-            "outstanding":  _shap(_W["outstanding"],  out_norm,    _NEUTRAL["outstanding"]),
-            "overdue":      _shap(_W["overdue"],       ov_norm,     _NEUTRAL["overdue"]),
-            # Split LTI contribution across loan_amount and loan_term
-            "loan_amount":  round(lti_shap * 0.5, 4),
-            "loan_term":    round(lti_shap * 0.5, 4),
-            "Salary":       _shap(_W["salary_level"], salary_norm, _NEUTRAL["salary_level"]),
-        }
-
-        approved = risk_prob < 0.50
+        # Pseudo-SHAP values (deviation from neutral baseline); the LTI
+        # contribution is split across loan_amount and loan_term.
+        lti_shap = np.round(_W["lti"] * (lti_norm - _NEUTRAL["lti"]), 4)
 
         return {
-            "approved": approved,
-            "probability_score": round(risk_prob, 4),
-            "shap_values": shap_values,
+            "approved": risk_prob < 0.50,
+            "probability_score": np.round(risk_prob, 4),
+            "shap_credit_score": np.round(_W["credit_score"] * (cs_norm - _NEUTRAL["credit_score"]), 4),
+            "shap_credit_grade": np.round(_W["credit_grade"] * (grade_norm - _NEUTRAL["credit_grade"]), 4),
+            "shap_outstanding":  np.round(_W["outstanding"] * (out_norm - _NEUTRAL["outstanding"]), 4),
+            "shap_overdue":      np.round(_W["overdue"] * (ov_norm - _NEUTRAL["overdue"]), 4),
+            "shap_loan_amount":  np.round(lti_shap * 0.5, 4),
+            "shap_loan_term":    np.round(lti_shap * 0.5, 4),
+            "shap_Salary":       np.round(_W["salary_level"] * (salary_norm - _NEUTRAL["salary_level"]), 4),
         }
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from src.db import models
+from src.db.database import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+_RESULT_QUEUE_MAXSIZE = 10_000
+# Rows per INSERT ... VALUES (...), (...) statement; matches the engine's
+# insertmanyvalues_page_size.
+_RESULT_BATCH_SIZE = 500
+# After the first queued row, wait this long for more before writing.
+_RESULT_FLUSH_INTERVAL_SECONDS = 0.05
+
+_UPSERT_COLUMNS = ("customer_id", "approved", "probability_score", "is_thin_file")
+_DIALECT_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Queued by stop_result_writer after the last row; the worker flushes its
+# current batch and returns when it reaches it.
+_STOP: Dict[str, Any] = {}
+
+_queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+_worker: Optional["asyncio.Task[None]"] = None
+# Append-only NDJSON journal of queued rows. It is written before a row is
+# queued and truncated once every journaled row has been committed, so rows
+# lost to a crash before the flush are replayed on the next start.
+_journal: Optional[IO[bytes]] = None
+# False once a batch failed to commit; its rows then stay in the journal
+# until the next start instead of being truncated away.
+_journal_clean = True
+
+
+async def upsert_result(db: AsyncSession, row: Dict[str, Any]) -> None:
+    """Idempotent write by request_id on the caller's session (used when no worker runs)."""
+    result = await db.execute(
+        select(models.CreditScoreResult).where(
+            models.CreditScoreResult.request_id == row["request_id"]
+        )
+    )
+    db_result = result.scalar_one_or_none()
+    if db_result is None:
+        db.add(models.CreditScoreResult(**row))
+    else:
+        for column in _UPSERT_COLUMNS:
+            setattr(db_result, column, row[column])
+    await db.commit()
+
+
+async def _flush(batch: List[Dict[str, Any]]) -> None:
+    # Last write wins per request_id; ON CONFLICT cannot touch a row twice
+    # within one statement.
+    rows = list({row["request_id"]: row for row in batch}.values())
+    insert = _DIALECT_INSERT[async_engine.dialect.name]
+    stmt = insert(models.CreditScoreResult)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["request_id"],
+        set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt, rows)
+        await session.commit()
+
+
+def _open_journal(path: Path) -> List[Dict[str, Any]]:
+    """Open the journal for appending and return rows left by a previous run."""
+    global _journal, _journal_clean
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pending: List[Dict[str, Any]] = []
+    torn_tail = False
+    if path.exists():
+        with path.open("rb") as fh:
+            for line in fh:
+                torn_tail = not line.endswith(b"\n")
+                if not line.strip():
+                    continue
+                try:
+                    pending.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # A torn final line from a crash mid-write.
+                    logger.warning("Skipping unreadable line in result journal %s", path)
+    # Unbuffered: each row reaches the OS in one write, so it survives a
+    # process crash.
+    _journal = path.open("ab", buffering=0)
+    if torn_tail:
+        # Keep the next row off the torn line.
+        _journal.write(b"\n")
+    _journal_clean = True
+    return pending
+
+
+def _close_journal() -> None:
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
+
+
+def _truncate_journal() -> None:
+    if _journal is not None and _journal_clean:
+        _journal.truncate(0)
+
+
+async def _flush_and_track(batch: List[Dict[str, Any]]) -> None:
+    global _journal_clean
+    try:
+        await _flush(batch)
+    except Exception as exc:
+        _journal_clean = False
+        logger.error("Failed to persist %d credit score result(s): %s", len(batch), exc)
+
+
+async def _result_worker(
+    queue: "asyncio.Queue[Dict[str, Any]]", replay: List[Dict[str, Any]]
+) -> None:
+    if replay:
+        logger.info("Replaying %d journaled credit score result(s)", len(replay))
+        for start in range(0, len(replay), _RESULT_BATCH_SIZE):
+            await _flush_and_track(replay[start : start + _RESULT_BATCH_SIZE])
+        if queue.empty():
+            _truncate_journal()
+    stopping = False
+    while not stopping:
+        row = await queue.get()
+        if row is _STOP:
+            return
+        batch = [row]
+        await asyncio.sleep(_RESULT_FLUSH_INTERVAL_SECONDS)
+        while len(batch) < _RESULT_BATCH_SIZE and not queue.empty():
+            row = queue.get_nowait()
+            if row is _STOP:
+                stopping = True
+                break
+            batch.append(row)
+        await _flush_and_track(batch)
+        if queue.empty():
+            _truncate_journal()
+
+
+def start_result_writer() -> None:
+    """Create the result queue and its single writer on the running loop."""
+    global _queue, _worker
+    if async_engine.dialect.name not in _DIALECT_INSERT:
+        logger.warning(
+            "No batched upsert for dialect %s; results are written per request",
+            async_engine.dialect.name,
+        )
+        return
+    replay: List[Dict[str, Any]] = []
+    if settings.RESULT_JOURNAL_PATH:
+        try:
+            replay = _open_journal(Path(settings.RESULT_JOURNAL_PATH))
+        except OSError as exc:
+            logger.warning("Result journal disabled (%s)", exc)
+    _queue = asyncio.Queue(maxsize=_RESULT_QUEUE_MAXSIZE)
+    _worker = asyncio.create_task(
+        _result_worker(_queue, replay), name="credit-result-writer"
+    )
+
+
+async def stop_result_writer() -> None:
+    """Stop the writer once it has flushed every queued row."""
+    global _queue, _worker
+    queue, worker = _queue, _worker
+    # New rows are written inline by their requests from here on.
+    _queue = None
+    _worker = None
+    if worker is not None and queue is not None:
+        if not worker.done():
+            # Behind every accepted row, so the worker drains the queue and
+            # commits its in-flight batch before returning.
+            await queue.put(_STOP)
+        try:
+            await worker
+        except Exception as exc:
+            logger.error("Credit score result writer failed: %s", exc)
+    if queue is not None:
+        # Only non-empty if the worker died early.
+        pending = []
+        while not queue.empty():
+            row = queue.get_nowait()
+            if row is not _STOP:
+                pending.append(row)
+        if pending:
+            await _flush_and_track(pending)
+    _truncate_journal()
+    _close_journal()
+
+
+def enqueue_result(row: Dict[str, Any]) -> bool:
+    """Queue a CreditScoreResult row; False means the caller must write it itself."""
+    if _queue is None:
+        return False
+    if _queue.full():
+        logger.warning("Result queue full, writing request %s inline", row.get("request_id"))
+        return False
+    if _journal is not None:
+        try:
+            _journal.write(orjson.dumps(row) + b"\n")
+        except OSError as exc:
+            logger.warning(
+                "Result journal write failed, writing request %s inline: %s",
+                row.get("request_id"),
+                exc,
+            )
+            return False
+    # Checked full() above and nothing else runs in between, so this cannot raise.
+    _queue.put_nowait(row)
+    return True
@@ -1,4 +1,6 @@
 import os
+from typing import Mapping, Optional
+
 from dotenv import dotenv_values
 
 # Read .env without mutating process environment so tests can monkeypatch
@@ -15,20 +17,31 @@ def _get_env(key: str, default: str) -> str:
         return str(file_value)
     return default
 
+
+def resolve_ollama_model(
+    env: Mapping[str, str] = os.environ,
+    dotenv: Mapping[str, Optional[str]] = _DOTENV,
+) -> str:
+    """Pick the Ollama model from the environment, then .env, then the default."""
+    # Preferred variable is OLLAMA_MODEL; LLM_MODEL remains as backward-compatible fallback.
+    return (
+        env.get("OLLAMA_MODEL")
+        or env.get("LLM_MODEL")
+        or dotenv.get("OLLAMA_MODEL")
+        or dotenv.get("LLM_MODEL")
+        or "qwen3:8b"
+    )
+
+
 # NOTE: config/settings.py is the canonical source for ChromaDB settings (CHROMA_PERSIST_DIR, CHROMA_COLLECTION).
 # All modules should import from config/settings.py to ensure consistent ChromaDB configuration.
 # The settings below are kept for backward compatibility with legacy code only.
 
 OLLAMA_BASE_URL = _get_env("OLLAMA_BASE_URL", "http://localhost:11434")
-# Preferred variable is OLLAMA_MODEL; LLM_MODEL remains as backward-compatible fallback.
-OLLAMA_MODEL = (
-    os.environ.get("OLLAMA_MODEL")
-    or os.environ.get("LLM_MODEL")
-    or _DOTENV.get("OLLAMA_MODEL")
-    or _DOTENV.get("LLM_MODEL")
-    or "qwen3:8b"
-)
+OLLAMA_MODEL = resolve_ollama_model()
 LLM_MODEL = OLLAMA_MODEL
+# How long Ollama keeps the model (and its prompt KV cache) loaded after a call.
+OLLAMA_KEEP_ALIVE = _get_env("OLLAMA_KEEP_ALIVE", "30m")
 # BGE-M3: multilingual (incl. Thai), 1024 dim, 8192 token context
 EMBED_MODEL = _get_env("EMBED_MODEL", "BAAI/bge-m3")
 
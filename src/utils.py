@@ -2,35 +2,85 @@
 Utility functions for LlamaIndex project
 """
 
+import atexit
 import functools
+import itertools
 import logging
+import logging.handlers
 import os
+import queue
+import statistics
 import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import json
 import time
+from collections import Counter, deque
+
+import orjson
 
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
 def setup_logging(log_level: str = None) -> None:
     """
     Setup logging configuration
+
+    Records are queued by the root logger and written to stdout and the log
+    file by a background listener thread, so logging calls never wait on I/O.
     
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    global _log_listener
+
+    if _log_listener is not None:
+        return
+
     log_level = log_level or settings.LOG_LEVEL
-    
+    if settings.LOG_FORMAT_COMPACT:
+        formatter = logging.Formatter('%(levelname)s %(name)s %(message)s')
+        # Opt-in only: these are process-wide, so any other formatter that
+        # prints %(process)d or %(threadName)s shows None from here on.
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # Buffer file writes so INFO/DEBUG records don't each cost a write();
+    # anything at ERROR or above flushes the buffer immediately.
+    file_handler = logging.FileHandler(
+        str(settings.PROJECT_ROOT / "logs" / "llama_index.log"), delay=True
+    )
+    file_handler.setFormatter(formatter)
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
+    atexit.register(buffered_file_handler.close)
+    atexit.register(buffered_file_handler.flush)
+
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # QueueHandler merges args into the message before enqueueing; the real
+    # handlers add the timestamp/level prefix on the listener thread.
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, buffered_file_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+    # Registered last so it runs first: drain the queue before the file flushes.
+    atexit.register(_log_listener.stop)
+
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(str(settings.PROJECT_ROOT / "logs" / "llama_index.log"))
-        ]
+        handlers=[queue_handler],
     )
 
 def validate_environment() -> bool:
@@ -55,7 +105,7 @@ def validate_environment() -> bool:
         logger.info("Environment validation passed")
         return True
     except Exception as e:
-        logger.error(f"Environment validation failed: {e}")
+        logger.error("Environment validation failed: %s", e)
         return False
 
 def format_response(response: Dict[str, Any]) -> str:
@@ -76,15 +126,17 @@ def format_response(response: Dict[str, Any]) -> str:
         output.append("")
     
     # Add sources if available
-    if "sources" in response and response["sources"]:
+    sources = response.get("sources")
+    if sources:
         output.append("**Sources:**")
-        for i, source in enumerate(response["sources"], 1):
+        for i, source in enumerate(sources, 1):
             output.append(f"{i}. {source['content']}")
-            if source.get("metadata"):
-                metadata_str = ", ".join([f"{k}: {v}" for k, v in source["metadata"].items()])
-                output.append(f"   Metadata: {metadata_str}")
-            if source.get("score"):
-                output.append(f"   Score: {source['score']:.4f}")
+            metadata = source.get("metadata")
+            if metadata:
+                output.append("   Metadata: " + ", ".join([f"{k}: {v}" for k, v in metadata.items()]))
+            score = source.get("score")
+            if score:
+                output.append(f"   Score: {score:.4f}")
             output.append("")
     
     return "\n".join(output)
@@ -98,11 +150,23 @@ def save_chat_history(history: List[Dict[str, str]], filename: str = "chat_histo
         filename: Output filename
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
-        logger.info(f"Chat history saved to {filename}")
+        # orjson writes UTF-8 directly (no ASCII escaping of Thai text) and
+        # serializes numpy values in metadata without a Python-side pass.
+        # OPT_NON_STR_KEYS keeps json.dump's handling of int/float dict keys.
+        Path(filename).write_bytes(
+            orjson.dumps(
+                history,
+                option=(
+                    orjson.OPT_INDENT_2
+                    | orjson.OPT_APPEND_NEWLINE
+                    | orjson.OPT_SERIALIZE_NUMPY
+                    | orjson.OPT_NON_STR_KEYS
+                ),
+            )
+        )
+        logger.info("Chat history saved to %s", filename)
     except Exception as e:
-        logger.error(f"Error saving chat history: {e}")
+        logger.error("Error saving chat history: %s", e)
 
 def load_chat_history(filename: str = "chat_history.json") -> List[Dict[str, str]]:
     """
@@ -116,18 +180,20 @@ def load_chat_history(filename: str = "chat_history.json") -> List[Dict[str, str
     """
     try:
         if Path(filename).exists():
-            with open(filename, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            logger.info(f"Chat history loaded from {filename}")
+            history = orjson.loads(Path(filename).read_bytes())
+            logger.info("Chat history loaded from %s", filename)
             return history
         return []
     except Exception as e:
-        logger.error(f"Error loading chat history: {e}")
+        logger.error("Error loading chat history: %s", e)
         return []
 
 def measure_performance(func):
     """
     Decorator to measure function performance
+
+    With PERF_LOG_SAMPLE=N > 1, only every Nth call is logged, together with
+    the mean and median of the most recent calls.
     
     Args:
         func: Function to measure
@@ -135,13 +201,32 @@ def measure_performance(func):
     Returns:
         Wrapped function
     """
+    sample_every = max(settings.PERF_LOG_SAMPLE, 1)
+    calls = itertools.count(1)
+    recent = deque(maxlen=1024)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        if not logger.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
+
+        start_ns = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
 
-        logger.info(f"{func.__name__} executed in {end_time - start_time:.2f} seconds")
+        if sample_every == 1:
+            logger.info("%s executed in %.2f seconds", func.__name__, elapsed)
+            return result
+
+        recent.append(elapsed)
+        n = next(calls)
+        if n % sample_every == 0:
+            window = list(recent)
+            logger.info(
+                "%s executed in %.2f seconds (call %d; last %d: mean %.2f s, median %.2f s)",
+                func.__name__, elapsed, n, len(window),
+                statistics.fmean(window), statistics.median(window),
+            )
         return result
 
     return wrapper
@@ -159,14 +244,16 @@ def get_document_summary(documents: List) -> Dict[str, Any]:
     if not documents:
         return {"total_documents": 0}
     
-    total_chars = sum(len(doc.text) for doc in documents)
-    total_words = sum(len(doc.text.split()) for doc in documents)
-    
-    file_types = {}
+    total_chars = 0
+    total_words = 0
+    file_types = Counter()
     for doc in documents:
+        text = doc.text
+        total_chars += len(text)
+        total_words += len(text.split())
         if hasattr(doc, 'file_path'):
-            ext = Path(doc.file_path).suffix.lower()
-            file_types[ext] = file_types.get(ext, 0) + 1
+            # splitext is plain string slicing; Path() would parse the whole path
+            file_types[os.path.splitext(doc.file_path)[1].lower()] += 1
     
     return {
         "total_documents": len(documents),
@@ -174,9 +261,23 @@ def get_document_summary(documents: List) -> Dict[str, Any]:
         "total_words": total_words,
         "avg_chars_per_doc": total_chars / len(documents),
         "avg_words_per_doc": total_words / len(documents),
-        "file_types": file_types
+        "file_types": dict(file_types)
     }
 
+def _write_if_changed(path: Path, text: str) -> None:
+    """Write text to path unless the file already holds exactly that content."""
+    # Compare against what text mode writes, i.e. with newlines translated
+    # to os.linesep (CRLF on Windows)
+    data = text.replace("\n", os.linesep).encode("utf-8")
+    try:
+        # Size check first so differing files are rejected without a read
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
+    except FileNotFoundError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
 def create_sample_documents() -> None:
     """
     Create sample documents for testing
@@ -207,8 +308,7 @@ def create_sample_documents() -> None:
     - Customer service: Chatbots, virtual assistants
     """
     
-    with open(documents_dir / "ai_overview.txt", "w", encoding="utf-8") as f:
-        f.write(sample_text)
+    _write_if_changed(documents_dir / "ai_overview.txt", sample_text)
     
     # Another sample document
     sample_text2 = """
@@ -231,10 +331,9 @@ def create_sample_documents() -> None:
     state-of-the-art performance across various NLP tasks.
     """
     
-    with open(documents_dir / "nlp_basics.txt", "w", encoding="utf-8") as f:
-        f.write(sample_text2)
+    _write_if_changed(documents_dir / "nlp_basics.txt", sample_text2)
     
-    logger.info(f"Sample documents created in {documents_dir}")
+    logger.info("Sample documents created in %s", documents_dir)
 
 def print_index_info(index_stats: Dict[str, Any]) -> None:
     """
@@ -259,44 +358,74 @@ def interactive_query_loop(query_engine_manager) -> None:
     Args:
         query_engine_manager: QueryEngineManager instance
     """
-    print("\n" + "="*50)
-    print("INTERACTIVE QUERY MODE")
-    print("="*50)
-    print("Type 'quit' or 'exit' to end the session")
-    print("Type 'help' for available commands")
-    print("="*50)
+    try:
+        import readline  # noqa: F401  (line editing and history for input())
+    except ImportError:
+        pass
+
+    def emit(lines: List[str]) -> None:
+        # One write and flush per turn instead of a print() per line
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    emit([
+        "\n" + "="*50,
+        "INTERACTIVE QUERY MODE",
+        "="*50,
+        "Type 'quit' or 'exit' to end the session",
+        "Type 'help' for available commands",
+        "="*50,
+    ])
+
+    # Suggestions cost an LLM call; reuse them for repeated topics this session
+    suggestion_cache: Dict[str, List[str]] = {}
     
     while True:
         user_input = input("\nEnter your query: ").strip()
+        command = user_input.lower()
         
-        if user_input.lower() in ['quit', 'exit']:
-            print("Goodbye!")
+        if command in ['quit', 'exit']:
+            emit(["Goodbye!"])
             break
-        elif user_input.lower() == 'help':
-            print("\nAvailable commands:")
-            print("- Type any question to query the documents")
-            print("- 'stats' - Show index statistics")
-            print("- 'suggestions <topic>' - Get query suggestions")
-            print("- 'quit' or 'exit' - End session")
+        elif command == 'help':
+            emit([
+                "\nAvailable commands:",
+                "- Type any question to query the documents",
+                "- 'stats' - Show index statistics",
+                "- 'suggestions <topic>' - Get query suggestions",
+                "- 'clear-cache' - Forget cached suggestions",
+                "- 'quit' or 'exit' - End session",
+            ])
             continue
-        elif user_input.lower() == 'stats':
+        elif command == 'stats':
             # You would need to pass the index to get stats
-            print("Index statistics not available in this mode")
+            emit(["Index statistics not available in this mode"])
+            continue
+        elif command == 'clear-cache':
+            suggestion_cache.clear()
+            emit(["Suggestion cache cleared"])
             continue
-        elif user_input.lower().startswith('suggestions'):
-            topic = user_input[12:].strip()
+        elif command.startswith('suggestions'):
+            parts = user_input.split(maxsplit=1)
+            topic = parts[1] if len(parts) > 1 else ""
             if topic:
-                suggestions = query_engine_manager.get_query_suggestions(topic)
-                print(f"\nQuery suggestions for '{topic}':")
-                for i, suggestion in enumerate(suggestions, 1):
-                    print(f"{i}. {suggestion}")
+                key = " ".join(topic.lower().split())
+                suggestions = suggestion_cache.get(key)
+                if suggestions is None:
+                    suggestions = query_engine_manager.get_query_suggestions(topic)
+                    if suggestions:
+                        # An empty list means the LLM call failed; retry next time
+                        suggestion_cache[key] = suggestions
+                out = [f"\nQuery suggestions for '{topic}':"]
+                out.extend(f"{i}. {suggestion}" for i, suggestion in enumerate(suggestions, 1))
+                emit(out)
             else:
-                print("Please provide a topic for suggestions")
+                emit(["Please provide a topic for suggestions"])
             continue
         
         # Process query
         try:
             result = query_engine_manager.query(user_input)
-            print("\n" + format_response(result))
+            emit(["\n" + format_response(result)])
         except Exception as e:
-            print(f"Error processing query: {e}")
+            emit([f"Error processing query: {e}"])
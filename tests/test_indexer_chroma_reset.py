@@ -11,6 +11,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from config.settings import settings
+from src.chroma_index import collection_metadata
 from src.indexer import IndexManager
 
 
@@ -20,7 +21,7 @@ class TestIndexerChromaReset(unittest.TestCase):
     @patch("src.indexer.VectorStoreIndex")
     @patch("src.indexer.StorageContext")
     @patch("src.indexer.ChromaVectorStore")
-    @patch("src.indexer.chromadb.PersistentClient")
+    @patch("src.chroma_index.chromadb.PersistentClient")
     def test_create_chroma_index_resets_collection_when_requested(
         self,
         mock_client_ctor,
@@ -40,13 +41,14 @@ class TestIndexerChromaReset(unittest.TestCase):
             settings.CHROMA_COLLECTION
         )
         mock_client.get_or_create_collection.assert_called_once_with(
-            settings.CHROMA_COLLECTION
+            settings.CHROMA_COLLECTION,
+            metadata=collection_metadata(),
         )
 
     @patch("src.indexer.VectorStoreIndex")
     @patch("src.indexer.StorageContext")
     @patch("src.indexer.ChromaVectorStore")
-    @patch("src.indexer.chromadb.PersistentClient")
+    @patch("src.chroma_index.chromadb.PersistentClient")
     def test_create_chroma_index_does_not_reset_when_not_requested(
         self,
         mock_client_ctor,
@@ -64,7 +66,8 @@ class TestIndexerChromaReset(unittest.TestCase):
 
         mock_client.delete_collection.assert_not_called()
         mock_client.get_or_create_collection.assert_called_once_with(
-            settings.CHROMA_COLLECTION
+            settings.CHROMA_COLLECTION,
+            metadata=collection_metadata(),
         )
 
 
@@ -0,0 +1,67 @@
+"""
+Unit tests for the matrix-backed in-memory vector store.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.simple import SimpleVectorStore
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+from src.matrix_vector_store import MatrixVectorStore
+
+
+def _nodes(vectors):
+    return [
+        TextNode(text=f"node {i}", id_=f"n{i}", embedding=vector.tolist())
+        for i, vector in enumerate(vectors)
+    ]
+
+
+class TestMatrixVectorStore(unittest.TestCase):
+    """MatrixVectorStore must rank exactly like SimpleVectorStore."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = rng.normal(size=(50, 16))
+        self.query_vec = rng.normal(size=16).tolist()
+
+    def test_top_k_matches_simple_vector_store(self):
+        simple, matrix = SimpleVectorStore(), MatrixVectorStore()
+        simple.add(_nodes(self.vectors))
+        matrix.add(_nodes(self.vectors))
+
+        query = VectorStoreQuery(query_embedding=self.query_vec, similarity_top_k=5)
+        expected = simple.query(query)
+        actual = matrix.query(query)
+
+        self.assertEqual(actual.ids, expected.ids)
+        np.testing.assert_allclose(actual.similarities, expected.similarities, rtol=1e-5)
+
+    def test_matrix_rebuilt_after_delete(self):
+        store = MatrixVectorStore()
+        nodes = _nodes(self.vectors)
+        store.add(nodes)
+
+        query = VectorStoreQuery(query_embedding=self.query_vec, similarity_top_k=1)
+        best_id = store.query(query).ids[0]
+        store.delete_nodes(node_ids=[best_id])
+
+        self.assertNotIn(best_id, store.query(query).ids)
+
+    def test_empty_store_returns_no_results(self):
+        result = MatrixVectorStore().query(
+            VectorStoreQuery(query_embedding=self.query_vec, similarity_top_k=3)
+        )
+        self.assertEqual(result.ids, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Unit tests for ModelRunnerService scoring."""
+
+import numpy as np
+
+from src.api.schemas.payload import ScoringRequest
+from src.services.model_runner import ModelRunnerService
+
+
+def test_run_inference_batch_matches_scalar_scoring():
+    applicants = [
+        ({"credit_bureau_score": 720, "credit_grade": "aa", "outstanding": 0.0, "overdue_amount": 0.0,
+          "has_coapplicant": True, "is_thin_file": False}, "Employed", 80000.0, 200000.0, 36),
+        ({"credit_bureau_score": 610, "credit_grade": "FF", "outstanding": 150000.0, "overdue_amount": 45.0,
+          "has_coapplicant": False, "is_thin_file": True}, "Unemployed", 12000.0, 500000.0, 12),
+        ({"credit_bureau_score": 680, "credit_grade": "XX", "outstanding": 20000.0, "overdue_amount": 0.0,
+          "has_coapplicant": False, "is_thin_file": False}, "Student", 30000.0, 90000.0, 24),
+    ]
+    scalar = []
+    columns = {key: [] for key in ("monthly_income", "loan_amount", "loan_term_months", "employment_status")}
+    for merged, occupation, income, loan, term in applicants:
+        payload = ScoringRequest(
+            request_id="req-batch",
+            customer_id="cust-batch",
+            demographics={"age": 35, "employment_status": occupation,
+                          "education_level": "Bachelor", "marital_status": "Single"},
+            financials={"monthly_income": income, "monthly_expenses": 0.0, "existing_debt": 0.0},
+            loan_details={"loan_amount": loan, "loan_term_months": term, "loan_purpose": "Auto"},
+        )
+        scalar.append(ModelRunnerService.run_inference(merged, payload))
+        for key, value in zip(columns, (income, loan, term, occupation)):
+            columns[key].append(value)
+    for key in applicants[0][0]:
+        columns[key] = [merged[key] for merged, *_ in applicants]
+
+    batch = ModelRunnerService.run_inference_batch({k: np.array(v) for k, v in columns.items()})
+
+    assert batch["approved"].tolist() == [r["approved"] for r in scalar]
+    assert np.allclose(batch["probability_score"], [r["probability_score"] for r in scalar], atol=1e-4)
+    for feature in scalar[0]["shap_values"]:
+        assert np.allclose(batch[f"shap_{feature}"], [r["shap_values"][feature] for r in scalar], atol=1e-4)
+
+
+def test_run_inference_returns_plain_python_values():
+    payload = ScoringRequest(
+        request_id="req-single",
+        customer_id="cust-single",
+        demographics={"age": 35, "employment_status": "Unemployed",
+                      "education_level": "Bachelor", "marital_status": "Single"},
+        financials={"monthly_income": 12000.0, "monthly_expenses": 0.0, "existing_debt": 0.0},
+        loan_details={"loan_amount": 500000.0, "loan_term_months": 12, "loan_purpose": "Auto"},
+    )
+    merged = {"credit_bureau_score": 610, "credit_grade": "FF", "outstanding": 150000.0,
+              "overdue_amount": 45.0, "has_coapplicant": False, "is_thin_file": True}
+
+    result = ModelRunnerService.run_inference(merged, payload)
+
+    assert result == {
+        "approved": False,
+        "probability_score": 0.9232,
+        "shap_values": {"credit_score": 0.025, "credit_grade": 0.19, "outstanding": 0.0589,
+                        "overdue": 0.045, "loan_amount": 0.0268, "loan_term": 0.0268, "Salary": 0.0156},
+    }
+    assert type(result["approved"]) is bool
+    assert type(result["probability_score"]) is float
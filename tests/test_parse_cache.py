@@ -0,0 +1,83 @@
+"""Tests for the mtime-keyed parse cache."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.parse_cache import ParseCache
+
+_CALLS = []
+
+
+def _parse_upper(path: Path) -> str:
+    _CALLS.append(path.name)
+    return path.read_text(encoding="utf-8").upper()
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        _CALLS.clear()
+
+    def test_unchanged_files_are_not_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            paths = [tmp / "a.txt", tmp / "b.txt"]
+            for path in paths:
+                path.write_text(path.stem, encoding="utf-8")
+            cache = ParseCache(tmp / "cache", max_workers=1)
+
+            self.assertEqual(cache.map(paths, _parse_upper), ["A", "B"])
+            self.assertEqual(cache.map(paths, _parse_upper), ["A", "B"])
+            self.assertEqual(_CALLS, ["a.txt", "b.txt"])
+
+    def test_modified_file_is_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            path = tmp / "a.txt"
+            path.write_text("old", encoding="utf-8")
+            cache = ParseCache(tmp / "cache", max_workers=1)
+            cache.map([path], _parse_upper)
+
+            path.write_text("newer", encoding="utf-8")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+            self.assertEqual(cache.map([path], _parse_upper), ["NEWER"])
+            self.assertEqual(_CALLS, ["a.txt", "a.txt"])
+
+    def test_entries_not_in_the_latest_map_are_pruned(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            paths = [tmp / "a.txt", tmp / "b.txt"]
+            for path in paths:
+                path.write_text(path.stem, encoding="utf-8")
+            cache = ParseCache(tmp / "cache", max_workers=1)
+            cache.map(paths, _parse_upper)
+
+            cache.map(paths[:1], _parse_upper, prune=False)
+            self.assertEqual(len(list((tmp / "cache").rglob("*.pkl"))), 2)
+
+            cache.map(paths[:1], _parse_upper)
+            self.assertEqual(len(list((tmp / "cache").rglob("*.pkl"))), 1)
+
+    def test_version_change_invalidates_entries(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            path = tmp / "a.txt"
+            path.write_text("a", encoding="utf-8")
+            cache = ParseCache(tmp / "cache", max_workers=1)
+
+            cache.map([path], _parse_upper, version="v1")
+            cache.map([path], _parse_upper, version="v1")
+            cache.map([path], _parse_upper, version="v2")
+            self.assertEqual(_CALLS, ["a.txt", "a.txt"])
+            self.assertEqual(len(list((tmp / "cache").rglob("*.pkl"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
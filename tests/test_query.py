@@ -4,7 +4,9 @@ Unit tests for query functionality
 
 import unittest
 import sys
+from collections import namedtuple
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 # Add project root to path
@@ -17,6 +19,9 @@ from src.data_loader import DataLoader
 from src.utils import validate_environment, format_response
 from config.settings import settings
 
+# Plain stand-ins for Document: only the attributes the helpers read
+FakeDoc = namedtuple("FakeDoc", ["text", "file_path", "metadata"], defaults=[None, {}])
+
 class TestDataLoader(unittest.TestCase):
     """Test data loader functionality"""
     
@@ -30,12 +35,8 @@ class TestDataLoader(unittest.TestCase):
     
     def test_add_metadata_to_documents(self):
         """Test metadata addition to documents"""
-        from llama_index.core import Document
-        
-        # Create mock document
-        doc = Mock(spec=Document)
-        doc.text = "Test document content"
-        doc.metadata = {}
+        # add_metadata_to_documents reassigns .metadata, so this one must be mutable
+        doc = SimpleNamespace(text="Test document content", metadata={})
         
         documents = [doc]
         result = self.data_loader.add_metadata_to_documents(documents)
@@ -116,6 +117,18 @@ class TestQueryEngineManager(unittest.TestCase):
         self.assertEqual(synth_kwargs["llm"], self.query_manager.llm)
         self.assertIn("text_qa_template", synth_kwargs)
         self.assertIn("refine_template", synth_kwargs)
+
+    @patch('src.query_engine.VectorIndexRetriever')
+    @patch('src.query_engine.get_response_synthesizer')
+    def test_create_query_engine_reuses_engine_per_configuration(self, mock_synthesizer, mock_retriever):
+        """Identical settings reuse the built engine; different top_k builds a new one"""
+        first = self.query_manager.create_query_engine(similarity_top_k=3, response_mode="compact")
+        second = self.query_manager.create_query_engine(similarity_top_k=3, response_mode="compact")
+        other = self.query_manager.create_query_engine(similarity_top_k=5, response_mode="compact")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(mock_retriever.call_count, 2)
     
     def test_query_response_format(self):
         """Test query response format"""
@@ -137,6 +150,46 @@ class TestQueryEngineManager(unittest.TestCase):
             self.assertEqual(result["question"], "Test question")
             self.assertEqual(result["answer"], "Test answer")
 
+    def test_retrieval_cache_is_scoped_per_manager(self):
+        """Managers over different indexes never share cached retrievals"""
+        from llama_index.core.schema import NodeWithScore, TextNode
+
+        def engine_for(text):
+            engine = Mock()
+            engine.retriever.retrieve.return_value = [
+                NodeWithScore(node=TextNode(text=text), score=0.9)
+            ]
+            return engine
+
+        other_manager = QueryEngineManager(Mock())
+        engine_a, engine_b = engine_for("index A"), engine_for("index B")
+        with patch.object(self.query_manager, 'create_query_engine', return_value=engine_a), \
+                patch.object(other_manager, 'create_query_engine', return_value=engine_b):
+            self.query_manager.query("Shared cache question")
+            self.query_manager.query("Shared cache question")
+            other_manager.query("Shared cache question")
+            self.query_manager.query("Shared cache question", query_embedding=[0.1])
+
+        # Second plain query is a hit; the embedding query bypasses the cache.
+        self.assertEqual(engine_a.retriever.retrieve.call_count, 2)
+        engine_b.retriever.retrieve.assert_called_once()
+
+    def test_aquery_many_embeds_once_and_keeps_order(self):
+        """Batched queries share one embedding call and return in input order"""
+        import asyncio
+
+        questions = ["first?", "second?"]
+        with patch.object(self.query_manager, 'embed_queries', return_value=[[0.1], [0.2]]) as embed, \
+                patch.object(self.query_manager, 'query',
+                             side_effect=lambda q, **kw: {"question": q, "embedding": kw["query_embedding"]}):
+            results = asyncio.run(self.query_manager.aquery_many(questions))
+
+        embed.assert_called_once_with(questions)
+        self.assertEqual(results, [
+            {"question": "first?", "embedding": [0.1]},
+            {"question": "second?", "embedding": [0.2]},
+        ])
+
 class TestUtils(unittest.TestCase):
     """Test utility functions"""
     
@@ -180,16 +233,9 @@ class TestUtils(unittest.TestCase):
     def test_get_document_summary_with_docs(self):
         """Test document summary with documents"""
         from src.utils import get_document_summary
-        from llama_index.core import Document
-        
-        # Create mock documents
-        doc1 = Mock(spec=Document)
-        doc1.text = "This is document one with some words."
-        doc1.file_path = "test1.txt"
         
-        doc2 = Mock(spec=Document)
-        doc2.text = "This is document two with more words."
-        doc2.file_path = "test2.txt"
+        doc1 = FakeDoc(text="This is document one with some words.", file_path="test1.txt")
+        doc2 = FakeDoc(text="This is document two with more words.", file_path="test2.txt")
         
         summary = get_document_summary([doc1, doc2])
         
@@ -198,6 +244,8 @@ class TestUtils(unittest.TestCase):
         self.assertGreater(summary["total_words"], 0)
         self.assertGreater(summary["avg_chars_per_doc"], 0)
         self.assertGreater(summary["avg_words_per_doc"], 0)
+        self.assertEqual(summary["total_words"], 14)
+        self.assertEqual(summary["file_types"], {".txt": 2})
 
 class TestSettings(unittest.TestCase):
     """Test settings configuration"""
@@ -4,7 +4,6 @@ These tests mock network/model behavior and never require a live Ollama server.
 """
 
 import sys
-import importlib
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -15,24 +14,16 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src import query as query_module
+from src.settings import resolve_ollama_model
 
 
-def test_settings_prefers_ollama_model_env(monkeypatch):
-    monkeypatch.setenv("OLLAMA_MODEL", "qwen3:8b")
-    monkeypatch.delenv("LLM_MODEL", raising=False)
-    import src.settings as settings_module
+def test_settings_prefers_ollama_model_env():
+    env = {"OLLAMA_MODEL": "qwen3:8b", "LLM_MODEL": "llama3.1:8b"}
+    assert resolve_ollama_model(env, dotenv={}) == "qwen3:8b"
 
-    importlib.reload(settings_module)
-    assert settings_module.OLLAMA_MODEL == "qwen3:8b"
 
-
-def test_settings_falls_back_to_legacy_llm_model_env(monkeypatch):
-    monkeypatch.delenv("OLLAMA_MODEL", raising=False)
-    monkeypatch.setenv("LLM_MODEL", "llama3.1:8b")
-    import src.settings as settings_module
-
-    importlib.reload(settings_module)
-    assert settings_module.OLLAMA_MODEL == "llama3.1:8b"
+def test_settings_falls_back_to_legacy_llm_model_env():
+    assert resolve_ollama_model({"LLM_MODEL": "llama3.1:8b"}, dotenv={}) == "llama3.1:8b"
 
 
 def test_get_engine_maps_connect_error_to_friendly_message():
@@ -45,11 +36,24 @@ def test_get_engine_maps_connect_error_to_friendly_message():
             query_module.get_engine()
 
 
-def test_explain_case_maps_timeout_to_friendly_message():
+def _fake_engine():
     fake_engine = Mock()
-    fake_engine.query.side_effect = httpx.ReadTimeout("timed out")
+    fake_engine.retrieve.return_value = []
+    return fake_engine
+
+
+def _fake_llm(*deltas):
+    fake_llm = Mock()
+    fake_llm.stream_chat.side_effect = lambda messages: (Mock(delta=d) for d in deltas)
+    return fake_llm
+
 
-    with patch.object(query_module, "get_engine", return_value=fake_engine):
+def test_explain_case_maps_timeout_to_friendly_message():
+    fake_llm = Mock()
+    fake_llm.stream_chat.side_effect = httpx.ReadTimeout("timed out")
+
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()), \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
         with pytest.raises(RuntimeError, match="timed out"):
             query_module.explain_case("hello", {"decision": {}})
 
@@ -59,9 +63,132 @@ def test_explain_case_maps_404_to_model_not_found_message():
     response = httpx.Response(404, request=request)
     http_error = httpx.HTTPStatusError("not found", request=request, response=response)
 
-    fake_engine = Mock()
-    fake_engine.query.side_effect = http_error
+    fake_llm = Mock()
+    fake_llm.stream_chat.side_effect = http_error
 
-    with patch.object(query_module, "get_engine", return_value=fake_engine):
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()), \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
         with pytest.raises(RuntimeError, match="was not found"):
             query_module.explain_case("hello", {"decision": {}})
+
+
+def test_explain_case_keeps_index_errors_out_of_the_ollama_table():
+    missing_index = RuntimeError("Unable to load ChromaDB collection. Build the index first.")
+
+    with patch.object(query_module, "get_engine", side_effect=missing_index), \
+            patch.object(query_module, "_get_llm", return_value=_fake_llm()):
+        with pytest.raises(RuntimeError, match="Build the index first"):
+            query_module.explain_case("index missing", {"decision": {}})
+
+
+def test_extract_json_ignores_braces_inside_strings_and_trailing_text():
+    text = 'Here you go: {"summary": "use {x} carefully", "reasons": []} -- done }'
+    assert query_module.extract_json(text) == {"summary": "use {x} carefully", "reasons": []}
+
+
+def test_extract_json_skips_non_json_braces_before_the_object():
+    text = '<think>{draft}</think>\n{"decision": "review"}'
+    assert query_module.extract_json(text) == {"decision": "review"}
+
+
+def test_extract_json_raises_when_no_object_closes():
+    with pytest.raises(ValueError, match="No JSON object"):
+        query_module.extract_json('{"decision": "review"')
+
+
+def test_explain_case_stops_streaming_once_the_object_closes():
+    consumed = []
+
+    def stream(messages):
+        for delta in ['<think>{draft}</think>\n{"summary": "ok", ', '"decision": "review", "reasons": []}', " trailing", " prose"]:
+            consumed.append(delta)
+            yield Mock(delta=delta)
+
+    fake_llm = Mock()
+    fake_llm.stream_chat.side_effect = stream
+    query_module.get_explain_cache().clear()
+
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()), \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
+        result = query_module.explain_case("stream?", {"a": 1})
+
+    assert result.decision == "review"
+    assert consumed == ['<think>{draft}</think>\n{"summary": "ok", ', '"decision": "review", "reasons": []}']
+
+
+def test_explain_case_reuses_cached_answer_for_identical_payload():
+    fake_llm = _fake_llm('{"summary": "ok", "decision": "review", "reasons": []}')
+    query_module.get_explain_cache().clear()
+
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()) as get_engine, \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
+        first = query_module.explain_case("why?", {"b": 1, "a": 2})
+        second = query_module.explain_case("why?", {"a": 2, "b": 1})
+
+    assert first == second
+    assert get_engine.call_count == 1
+    assert fake_llm.stream_chat.call_count == 1
+
+
+def test_explain_case_coalesces_concurrent_identical_requests():
+    import threading
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_stream(messages):
+        started.set()
+        release.wait(timeout=5)
+        yield Mock(delta='{"summary": "ok", "decision": "review", "reasons": []}')
+
+    fake_llm = Mock()
+    fake_llm.stream_chat.side_effect = slow_stream
+    query_module.get_explain_cache().clear()
+    results = []
+
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()), \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
+        first = threading.Thread(target=lambda: results.append(query_module.explain_case("q", {"a": 1})))
+        first.start()
+        assert started.wait(timeout=5)
+        second = threading.Thread(target=lambda: results.append(query_module.explain_case("q", {"a": 1})))
+        second.start()
+        release.set()
+        first.join(timeout=5)
+        second.join(timeout=5)
+
+    assert len(results) == 2 and results[0] == results[1]
+    assert fake_llm.stream_chat.call_count == 1
+
+
+def test_aexplain_case_streams_and_shares_the_sync_cache():
+    import asyncio
+
+    async def astream(messages):
+        async def gen():
+            for delta in ['{"summary": "ok", ', '"decision": "review", "reasons": []}', " trailing"]:
+                yield Mock(delta=delta)
+
+        return gen()
+
+    fake_llm = Mock()
+    fake_llm.astream_chat.side_effect = astream
+    query_module.get_explain_cache().clear()
+
+    with patch.object(query_module, "get_engine", return_value=_fake_engine()), \
+            patch.object(query_module, "_get_llm", return_value=fake_llm):
+        result = asyncio.run(query_module.aexplain_case("async?", {"a": 1}))
+        cached = query_module.explain_case("async?", {"a": 1})
+
+    assert result.decision == "review"
+    assert cached == result
+    assert fake_llm.astream_chat.call_count == 1
+    fake_llm.stream_chat.assert_not_called()
+
+
+def test_friendly_error_maps_ollama_client_exceptions():
+    from ollama import ResponseError
+
+    assert "Cannot connect" in str(query_module._friendly_ollama_error(ConnectionError("refused")))
+    assert "was not found" in str(query_module._friendly_ollama_error(ResponseError("no model", 404)))
+    assert "HTTP 500" in str(query_module._friendly_ollama_error(ResponseError("boom", 500)))
@@ -0,0 +1,52 @@
+"""Shutdown behaviour of the batched credit-score result writer."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services import result_writer
+
+
+def _run_writer(monkeypatch, tmp_path, flush):
+    """Enqueue one row, stop the writer mid flush interval, return the journal."""
+    monkeypatch.setattr(result_writer, "_flush", flush)
+    journal = tmp_path / "results.ndjson"
+
+    async def scenario():
+        result_writer._open_journal(journal)
+        result_writer._queue = asyncio.Queue()
+        result_writer._worker = asyncio.create_task(
+            result_writer._result_worker(result_writer._queue, [])
+        )
+        assert result_writer.enqueue_result({"request_id": "r1"})
+        # The worker has dequeued the row and is waiting out the flush interval.
+        await asyncio.sleep(result_writer._RESULT_FLUSH_INTERVAL_SECONDS / 5)
+        await result_writer.stop_result_writer()
+
+    asyncio.run(scenario())
+    return journal
+
+
+def test_stop_flushes_the_batch_the_worker_is_holding(monkeypatch, tmp_path):
+    flushed = []
+
+    async def flush(batch):
+        flushed.extend(row["request_id"] for row in batch)
+
+    journal = _run_writer(monkeypatch, tmp_path, flush)
+
+    assert flushed == ["r1"]
+    assert journal.stat().st_size == 0
+    assert result_writer.enqueue_result({"request_id": "r2"}) is False
+
+
+def test_stop_keeps_the_journal_when_the_last_batch_fails(monkeypatch, tmp_path):
+    async def flush(batch):
+        raise RuntimeError("database unavailable")
+
+    journal = _run_writer(monkeypatch, tmp_path, flush)
+
+    assert b'"request_id":"r1"' in journal.read_bytes()
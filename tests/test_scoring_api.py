@@ -1,9 +1,26 @@
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
+from src.services.feature_merger import FeatureMergerService
 
 client = TestClient(app)
 
+
+@pytest.fixture(scope="module", autouse=True)
+def _app_lifespan():
+    # Entering the client runs the app lifespan, which creates the DB tables.
+    with client:
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_feature_cache():
+    # Features cached by one test must not decide thin-file status in another.
+    FeatureMergerService.clear_cache()
+    yield
+    FeatureMergerService.clear_cache()
+
+
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200